@@ -0,0 +1,27 @@
+"""
+Headless sliding puzzle solver: A* and IDA* on packed states, for boards of any size,
+and a lookup table of the whole state space for the small boards.
+The pygame front end (SlidePuzzle) is an optional extra, and the batch, binary file and cache modules
+(multiprocessing, sqlite3) are only needed by some uses: their names are imported on first use.
+"""
+import importlib
+
+from .board import (BOARDHEIGHT,BOARDWIDTH,UP,DOWN,LEFT,RIGHT,Board,UnsolvablePuzzleError,
+                    check_solvable,decode_state,encode_state,get_board,goal_state,is_solvable,parse_board)
+from .frontier import Frontier
+from .heuristics import HEURISTIC_FUNCTIONS,HEURISTICS,HeuristicTable,get_heuristic
+from .lookup_table import LookupSolver,LookupTable,load_lookup_table
+from .node_store import NodeStore
+from .pattern_database import PatternDatabase,PatternDatabaseHeuristic,load_pattern_database
+from .search import OPTIMAL_MODES,SEARCH_MODES,BudgetExceededError,Node,solve
+from .stats import SearchResult,SearchStats
+
+
+LAZY_NAMES = {'read_instances':'batch','solve_batch':'batch','solve_instance':'batch',
+              'BinaryReader':'binary_io','BinaryWriter':'binary_io','binary_to_jsonl':'binary_io','jsonl_to_binary':'binary_io',
+              'SolutionCache':'cache','SlidePuzzle':'visualizer'}
+
+def __getattr__(name):
+    if name in LAZY_NAMES:
+        return getattr(importlib.import_module('.'+LAZY_NAMES[name],__name__),name)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__,name))
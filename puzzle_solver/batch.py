@@ -0,0 +1,78 @@
+"""Batch solving of many instances with a pool of processes."""
+import csv
+import functools
+import json
+import multiprocessing
+import time
+
+from .board import UnsolvablePuzzleError,parse_board
+from .cache import get_solution_cache
+from .search import BudgetExceededError,solve
+
+
+# Batch solving: instances are read from JSONL or CSV files and solved by a pool of processes.
+# A JSONL line is an object {"id": ..., "start": ..., "goal": ...}, the boards being nested lists of rows,
+# or flat lists of tiles with "rows" and "cols" (a square board by default).
+# A CSV file has the columns id, start, goal and optionally rows, cols, the boards are tiles separated by spaces.
+def read_instances(f,format='jsonl'):
+    """
+    Yields the instances of an open file one at a time, as dicts with id, start and goal.
+    Instances without id are numbered by their position in the file.
+    """
+    if format == 'csv':
+        records = csv.DictReader(f)
+    else:
+        records = (json.loads(line) for line in f if line.strip())
+    for index,record in enumerate(records):
+        yield parse_instance(record,index)
+
+def parse_instance(record,index=None) -> dict:
+    """Returns the instance of a record read from JSON or CSV, numbered by index when it has no id."""
+    rows,cols = record.get('rows') or None,record.get('cols') or None
+    return {'id':index if record.get('id') in (None,'') else record['id'],
+            'start':parse_board(record['start'],rows,cols),
+            'goal':parse_board(record['goal'],rows,cols)}
+
+def solve_instance(instance,heuristic_function='manhattan',mode=None,cache=None,options=None) -> dict:
+    """
+    Solves one instance, returns a result that can be written as JSON: status is 'solved' with the path,
+    its length and the stats of the search, 'unsolvable', 'budget_exceeded', or 'error' with the message.
+    With cache, the path of a SQLite file, the paths are looked up in and added to a SolutionCache.
+    options are passed to the search mode, as its time_limit (see solve).
+    """
+    options = options or {}
+    result = {'id':instance['id']}
+    start = time.time()
+    try:
+        if cache is None:
+            path = solve(instance['start'],instance['goal'],heuristic_function,mode,quiet=True,**options)
+        else:
+            path = get_solution_cache(cache).solve(instance['start'],instance['goal'],heuristic_function,mode,**options)
+    except UnsolvablePuzzleError as e:
+        result.update(status='unsolvable',error=str(e))
+    except BudgetExceededError as e:
+        result.update(status='budget_exceeded',error=str(e))
+    except Exception as e:
+        result.update(status='error',error='{}: {}'.format(type(e).__name__,e))
+    else:
+        result.update(status='solved',length=len(path),path=[[int(tile),action] for tile,action in path],stats=path.stats.as_dict())
+    result['time'] = round(time.time()-start,6)
+    return result
+
+def solve_batch(instances,heuristic_function='manhattan',mode=None,workers=None,chunksize=16,ordered=True,cache=None,options=None):
+    """
+    Solves a stream of instances with a pool of worker processes, workers defaults to the number of cores.
+    The instances are sent to the workers by chunks of chunksize, results are yielded as they come:
+    in the order of the instances when ordered, else as soon as they are solved.
+    With workers=1 the instances are solved in this process.
+    Every process uses the SQLite file cache as its SolutionCache, if given, options are passed to the search mode.
+    """
+    solver = functools.partial(solve_instance,heuristic_function=heuristic_function,mode=mode,cache=cache,options=options)
+    if workers == 1:
+        yield from map(solver,instances)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        if ordered:
+            yield from pool.imap(solver,instances,chunksize)
+        else:
+            yield from pool.imap_unordered(solver,instances,chunksize)
@@ -0,0 +1,250 @@
+"""
+Benchmark of the searches on fixed instance sets, with a JSON report that can be compared to a baseline.
+python -m puzzle_solver bench --help for the command line.
+"""
+import collections
+import functools
+import math
+import multiprocessing
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from .board import get_board,goal_state
+from .search import solve
+
+try:
+    import resource
+except ImportError: # Unix only, the max RSS is then not reported
+    resource = None
+
+
+REPORT_VERSION = 1
+RANDOM_DEPTHS = (8,12,16,20,24,28) # optimal depths of the random 3x3 instances
+INSTANCE_SETS = ('random_3x3','hardest_3x3','korf100')
+REPEATS = 5 # runs of every instance, its latency is the fastest run
+NOISE_FLOOR = 0.0005 # seconds of median latency that are never a regression, whatever the tolerance
+
+# Instance sets: lists of dicts with id, start and goal like batch.read_instances.
+# The 3x3 sets are drawn from a breadth first search of the whole state space, so the optimal depth is exact.
+def state_space_depths(rows=3,cols=3,goal=None) -> dict:
+    """
+    Returns the optimal depth of every state reachable from the goal state, a dict packed state -> depth.
+    The whole state space is kept in memory: (rows*cols)!/2 states, only for boards up to 3x3.
+    """
+    board = get_board(rows,cols)
+    if board.size > 9:
+        raise ValueError('the state space of a {}x{} board is too large to be searched'.format(rows,cols))
+    goal_code = board.encode(goal_state(rows,cols) if goal is None else goal)
+    neighbors,tile_bits,tile_mask = board.neighbors,board.tile_bits,board.tile_mask
+    depths = {goal_code:0}
+    level = [(goal_code,board.blank_index(goal_code))]
+    depth = 0
+    while level:
+        depth += 1
+        next_level = []
+        for current,blank in level:
+            blank_shift = blank*tile_bits
+            for index,shift,_ in neighbors[blank]:
+                tile = (current >> shift) & tile_mask
+                child = current ^ (tile << shift) ^ (tile << blank_shift)
+                if child not in depths:
+                    depths[child] = depth
+                    next_level.append((child,index))
+        level = next_level
+    return depths
+
+@functools.lru_cache(maxsize=None)
+def goal_depths(rows=3,cols=3) -> dict:
+    """state_space_depths from the default goal state, computed once and shared by the instance sets."""
+    return state_space_depths(rows,cols)
+
+def random_instances(seed=0,depths=RANDOM_DEPTHS,per_depth=10,depth_table=None) -> list:
+    """
+    Returns random solvable 3x3 instances, per_depth instances of every optimal depth in depths.
+    The same seed always gives the same instances.
+    """
+    board = get_board(3,3)
+    goal = goal_state(3,3)
+    depth_table = goal_depths(3,3) if depth_table is None else depth_table
+    buckets = collections.defaultdict(list)
+    for code,depth in depth_table.items():
+        buckets[depth].append(code)
+    rng = random.Random(seed)
+    instances = []
+    for depth in depths:
+        codes = sorted(buckets[depth])
+        for number,code in enumerate(rng.sample(codes,min(per_depth,len(codes)))):
+            instances.append({'id':'d{}-{}'.format(depth,number),'start':board.decode(code),'goal':goal,'depth':depth})
+    return instances
+
+def hardest_instances(depth_table=None) -> list:
+    """Returns the 3x3 instances of the largest optimal depth, the two 31 moves instances."""
+    board = get_board(3,3)
+    goal = goal_state(3,3)
+    depth_table = goal_depths(3,3) if depth_table is None else depth_table
+    depth = max(depth_table.values())
+    codes = sorted(code for code,code_depth in depth_table.items() if code_depth == depth)
+    return [{'id':'h{}-{}'.format(depth,number),'start':board.decode(code),'goal':goal,'depth':depth}
+            for number,code in enumerate(codes)]
+
+def read_korf_instances(f) -> list:
+    """
+    Reads the 100 instances of the 15 puzzle of Korf (1985) from an open file,
+    one instance per line: 16 tiles in row major order, 0 being the blank, optionally preceded by its number.
+    The goal state of these instances has the blank in the upper left cell.
+    """
+    goal = np.arange(16).reshape(4,4)
+    instances = []
+    for line in f:
+        numbers = line.split()
+        if not numbers or numbers[0].startswith('#'):
+            continue
+        if len(numbers) not in (16,17):
+            raise ValueError('a Korf instance has 16 tiles, got {!r}'.format(line.strip()))
+        instance_id = int(numbers[0]) if len(numbers) == 17 else len(instances)+1
+        instances.append({'id':instance_id,'start':np.array(numbers[-16:],dtype=int).reshape(4,4),'goal':goal})
+    return instances
+
+def load_instance_set(name,seed=0,per_depth=10,korf_file=None) -> list:
+    """Returns the instances of one of INSTANCE_SETS, korf100 being read from korf_file."""
+    if name == 'random_3x3':
+        return random_instances(seed,per_depth=per_depth)
+    if name == 'hardest_3x3':
+        return hardest_instances()
+    if name == 'korf100':
+        if korf_file is None:
+            raise ValueError('the korf100 set is read from a file, give its path')
+        with open(korf_file) as f:
+            return read_korf_instances(f)
+    raise ValueError('unknown instance set {!r}, expected one of {}'.format(name,', '.join(INSTANCE_SETS)))
+
+
+# Running the benchmark
+def max_rss() -> int:
+    """Returns the max resident set size of the process in kilobytes, None when it is not known."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss//1024 if sys.platform == 'darwin' else rss # bytes on macOS
+
+def latency_summary(latencies) -> dict:
+    """Returns the median, p95, p99, mean and max of latencies in seconds."""
+    if not latencies:
+        return {}
+    median,p95,p99 = np.percentile(latencies,[50,95,99])
+    return {'median':float(median),'p95':float(p95),'p99':float(p99),
+            'mean':float(np.mean(latencies)),'max':float(max(latencies))}
+
+def run_benchmark(instances,heuristic_function='manhattan',mode=None,trace_memory=False,repeats=REPEATS) -> dict:
+    """
+    Solves every instance with a heuristic and a search mode, returns the measures of the run.
+    Every instance is solved repeats times and its fastest run is kept, the slower ones being slowed down by the rest
+    of the machine. Expansions per second are measured on the search time, the latency on the whole call of solve.
+    With trace_memory the peak of memory allocated by Python is measured by tracemalloc, which slows down the searches.
+    max_rss is the peak of the whole process, so it only measures this run when the process runs nothing else:
+    see isolated_benchmark.
+    """
+    latencies = []
+    expansions = generations = total_length = 0
+    search_time = 0.0
+    memory_peak = 0
+    errors = []
+    for instance in instances:
+        latency = instance_search_time = math.inf
+        for _ in range(repeats):
+            if trace_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            try:
+                path = solve(instance['start'],instance['goal'],heuristic_function,mode,quiet=True)
+            except Exception as e:
+                errors.append({'id':instance['id'],'error':'{}: {}'.format(type(e).__name__,e)})
+                break
+            finally:
+                if trace_memory:
+                    memory_peak = max(memory_peak,tracemalloc.get_traced_memory()[1])
+                    tracemalloc.stop()
+            latency = min(latency,time.perf_counter()-start)
+            instance_search_time = min(instance_search_time,path.stats.search_time)
+        else:
+            latencies.append(latency)
+            expansions += path.stats.expansions
+            generations += path.stats.generations
+            search_time += instance_search_time
+            total_length += len(path)
+    return {'heuristic':heuristic_function,'mode':mode,
+            'instances':len(instances),'solved':len(latencies),'errors':errors,'repeats':repeats,
+            'total_length':total_length,'expansions':expansions,'generations':generations,
+            'nodes_per_second':expansions/search_time if search_time else 0.0,
+            'latency':latency_summary(latencies),
+            'tracemalloc_peak':memory_peak if trace_memory else None,
+            'max_rss':max_rss()}
+
+def isolated_benchmark(instances,heuristic_function='manhattan',mode=None,trace_memory=False,repeats=REPEATS) -> dict:
+    """
+    run_benchmark in a new process, started from a fresh interpreter (not forked), so that its max_rss
+    is the peak of this run alone and not of the runs before it or of the instance sets of the parent.
+    """
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(run_benchmark,(instances,heuristic_function,mode,trace_memory,repeats))
+
+def benchmark(instance_sets,heuristic_functions=('manhattan',),modes=(None,),trace_memory=False,log=None,isolated=True,
+              repeats=REPEATS) -> dict:
+    """
+    Runs every heuristic and search mode on every instance set, a dict name -> instances, each instance repeats times.
+    Returns the report, with one result per (instance set, heuristic, mode).
+    Every run has its own process when isolated, else they all run in this process and max_rss is not per run.
+    log(result) is called after every run, if given.
+    """
+    run = isolated_benchmark if isolated else run_benchmark
+    results = []
+    for name,instances in instance_sets.items():
+        for heuristic_function in heuristic_functions:
+            for mode in modes:
+                result = {'set':name}
+                result.update(run(instances,heuristic_function,mode,trace_memory,repeats))
+                results.append(result)
+                if log is not None:
+                    log(result)
+    return {'version':REPORT_VERSION,'python':platform.python_version(),'platform':platform.platform(),
+            'time':time.strftime('%Y-%m-%dT%H:%M:%S'),'results':results}
+
+
+# Comparison with a baseline: another report, matched on (instance set, heuristic, mode).
+def result_key(result) -> tuple:
+    return result['set'],result['heuristic'],result['mode']
+
+def compare_reports(report,baseline,tolerance=0.1,noise_floor=NOISE_FLOOR) -> list:
+    """
+    Compares a report with a baseline report, returns the regressions as a list of dicts.
+    The median latency is a regression when it is more than tolerance slower than the baseline and more than
+    noise_floor seconds slower, so that the timer noise of sub-millisecond runs is not one.
+    The memory peaks (max_rss and tracemalloc_peak, when both reports have them) are when they are more than tolerance larger.
+    Expansions and path lengths must be equal since the searches are deterministic.
+    """
+    baseline_results = {result_key(result):result for result in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        base = baseline_results.get(result_key(result))
+        if base is None or base['instances'] != result['instances']:
+            continue
+        differences = {}
+        median,base_median = result['latency'].get('median'),base['latency'].get('median')
+        if median is not None and base_median and median > max(base_median*(1+tolerance),base_median+noise_floor):
+            differences['median_latency'] = [base_median,median]
+        for field in ('max_rss','tracemalloc_peak'):
+            peak,base_peak = result.get(field),base.get(field)
+            if peak is not None and base_peak and peak > base_peak*(1+tolerance):
+                differences[field] = [base_peak,peak]
+        for field in ('solved','total_length','expansions'):
+            if result[field] != base[field]:
+                differences[field] = [base[field],result[field]]
+        if differences:
+            regressions.append({'set':result['set'],'heuristic':result['heuristic'],'mode':result['mode'],
+                                'differences':differences})
+    return regressions
@@ -0,0 +1,251 @@
+"""Compact binary files of instances and their paths, with converters from and to JSONL."""
+import json
+import math
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from .batch import parse_instance
+from .board import UP,DOWN,LEFT,RIGHT,get_board
+from .pattern_database import rank_pattern,unrank_pattern
+
+
+# A binary file holds the instances of one board and one goal state: the header gives the size of the board
+# and the goal, then come the records, one per instance, each of
+#   the rank of the initial state (rank_pattern of its tiles), in the fewest bytes holding size! - 1,
+#   the length of the path, 2 bytes, NO_PATH when the instance was not solved,
+#   the moves, 2 bits each (the index of the action in BINARY_ACTIONS), 4 per byte starting from the low bits.
+# The moved tiles are not stored, they are found again by playing the moves from the initial state.
+# The rank is the id of the instance: a 31-move 3x3 path takes 13 bytes.
+# A file without records holds the goal of the instances when it was known, else a header of a 0x0 board.
+BINARY_MAGIC = b'SPZB'
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<4sBBB') # magic, version, rows, cols, then the goal tiles, one byte each
+BINARY_LENGTH = struct.Struct('<H')
+BINARY_ACTIONS = (DOWN,RIGHT,UP,LEFT) # the order of move_offsets
+NO_PATH = 0xFFFF
+ACTION_CODES = {action:code for code,action in enumerate(BINARY_ACTIONS)}
+BYTE_ACTIONS = [tuple(BINARY_ACTIONS[(byte >> shift) & 3] for shift in (0,2,4,6)) for byte in range(256)] # the 4 moves of every byte
+
+
+def rank_bytes(size) -> int:
+    """Number of bytes of the rank of a state of size cells."""
+    return max(1,((math.factorial(size)-1).bit_length()+7)//8)
+
+def pack_moves(actions) -> bytes:
+    """Packs the actions 4 per byte."""
+    codes = [ACTION_CODES[action] for action in actions]
+    codes += [0]*(-len(codes) % 4)
+    return bytes(codes[i] | codes[i+1] << 2 | codes[i+2] << 4 | codes[i+3] << 6 for i in range(0,len(codes),4))
+
+def unpack_moves(data,length) -> list:
+    """Inverse of pack_moves, length being the number of actions."""
+    actions = []
+    for byte in data:
+        actions.extend(BYTE_ACTIONS[byte])
+    return actions[:length]
+
+def move_table(rows,cols) -> list:
+    """For every cell of the blank, a dict action -> cell of the tile moved by the action, the allowed actions only."""
+    return [{action:index for index,_,action in moves} for moves in get_board(rows,cols).neighbors]
+
+def play_moves(tiles,actions,moves) -> list:
+    """
+    Plays the actions on tiles, the list of the tiles of a state (changed in place), moves being its move_table.
+    Returns the path, a list of (tile, action). Raises ValueError on an action not allowed where the blank is.
+    """
+    blank = tiles.index(0)
+    path = []
+    for number,action in enumerate(actions):
+        index = moves[blank].get(action)
+        if index is None:
+            raise ValueError('move {} of the path: {} is not allowed with the blank at cell {}'.format(number,action,blank))
+        tile = tiles[index]
+        tiles[blank],tiles[index] = tile,0
+        blank = index
+        path.append((tile,action))
+    return path
+
+def check_tiles(state,size,name):
+    """Raises ValueError if the tiles of the state are not 0 to size-1, the states that can be ranked."""
+    if sorted(np.ravel(state).tolist()) != list(range(size)):
+        raise ValueError('the {} state {} does not hold the tiles 0 to {}'.format(name,np.asarray(state).tolist(),size-1))
+
+
+class BinaryWriter():
+    """
+    Writes the instances of one goal state to an open binary file, one record at a time.
+    The header is written from goal when it is given, else with the first record, from the goal of that instance.
+    close() ends the file (the file itself is left open): a file without records still gets its header.
+    """
+    def __init__(self,f,goal=None):
+        self.file = f
+        self.goal = None
+        self.count = 0
+        if goal is not None:
+            self.write_header(goal)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*exc):
+        self.close()
+
+    def close(self):
+        """Writes the header of a 0x0 board if there is none yet, the file then reads as having no records."""
+        if self.goal is None:
+            self.file.write(BINARY_HEADER.pack(BINARY_MAGIC,BINARY_VERSION,0,0))
+            self.goal = np.zeros((0,0),dtype=int)
+            self.size = 0
+
+    def write_header(self,goal):
+        self.goal = np.array(goal)
+        rows,cols = self.goal.shape
+        self.size = rows*cols
+        check_tiles(self.goal,self.size,'goal')
+        self.rank_bytes = rank_bytes(self.size)
+        self.moves = move_table(rows,cols)
+        self.file.write(BINARY_HEADER.pack(BINARY_MAGIC,BINARY_VERSION,rows,cols)+bytes(self.goal.ravel().tolist()))
+
+    def write(self,start,goal,path=None):
+        """
+        Writes the instance from start to goal with its path, a list of (tile, action), None when not solved.
+        Raises ValueError, writing nothing, when the states are not boards of the file: the tiles 0 to size-1 in the shape of the goal,
+        or when the path does not lead from start to goal: the path is played, every move must be allowed and move its tile.
+        """
+        start = np.asarray(start)
+        if self.goal is None:
+            self.write_header(goal)
+        elif not np.array_equal(goal,self.goal):
+            raise ValueError('a binary file holds the instances of one goal state, {} is not {}'.format(
+                np.asarray(goal).tolist(),self.goal.tolist()))
+        if start.shape != self.goal.shape:
+            raise ValueError('the initial state is {}x{} and the goal state {}x{}'.format(*start.shape,*self.goal.shape))
+        check_tiles(start,self.size,'initial')
+        record = rank_pattern(start.ravel().tolist(),self.size).to_bytes(self.rank_bytes,'little')
+        if path is None:
+            record += BINARY_LENGTH.pack(NO_PATH)
+        else:
+            if len(path) >= NO_PATH:
+                raise ValueError('paths of {} moves and more cannot be stored'.format(NO_PATH))
+            tiles = start.ravel().tolist()
+            for number,((tile,action),(moved,_)) in enumerate(zip(path,play_moves(tiles,[action for _,action in path],self.moves))):
+                if tile != moved:
+                    raise ValueError('move {} of the path: {} moves tile {}, not {}'.format(number,action,moved,tile))
+            if tiles != self.goal.ravel().tolist():
+                raise ValueError('the path does not lead to the goal state')
+            record += BINARY_LENGTH.pack(len(path))+pack_moves([action for _,action in path])
+        self.file.write(record)
+        self.count += 1
+
+
+class BinaryReader():
+    """
+    A binary file mapped in memory, iterated one record at a time without reading the whole file.
+    Every record is a dict like the instances of read_instances, id being the rank of the initial state,
+    with the path as a list of (tile, action), None when the instance was not solved.
+    """
+    def __init__(self,path):
+        with open(path,'rb') as f:
+            if os.fstat(f.fileno()).st_size < BINARY_HEADER.size: # an empty file cannot be mapped
+                raise ValueError('{} is not a binary instance file, it is {}'.format(
+                    path,'empty' if not os.fstat(f.fileno()).st_size else 'shorter than a header'))
+            self.data = mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ)
+        magic,version,self.rows,self.cols = BINARY_HEADER.unpack_from(self.data)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            self.data.close()
+            raise ValueError('{} is not a binary instance file'.format(path))
+        self.size = self.rows*self.cols
+        self.offset = BINARY_HEADER.size+self.size
+        if len(self.data) < self.offset or (not self.size and len(self.data) > self.offset):
+            self.data.close()
+            raise ValueError('{} is truncated or has records of an empty board'.format(path))
+        self.goal = np.array(list(self.data[BINARY_HEADER.size:self.offset])).reshape(self.rows,self.cols)
+        self.rank_bytes = rank_bytes(self.size)
+        self.ranks = math.factorial(self.size)
+        self.moves = move_table(self.rows,self.cols) if self.size else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*exc):
+        self.close()
+
+    def close(self):
+        self.data.close()
+
+    def records(self):
+        """Yields (rank, path length or None, actions) of every record, without rebuilding the states."""
+        data,offset,end = self.data,self.offset,len(self.data)
+        while offset < end:
+            if offset+self.rank_bytes+BINARY_LENGTH.size > end:
+                raise ValueError('truncated record at byte {}'.format(offset))
+            rank = int.from_bytes(data[offset:offset+self.rank_bytes],'little')
+            if rank >= self.ranks:
+                raise ValueError('invalid rank at byte {}'.format(offset))
+            offset += self.rank_bytes
+            length, = BINARY_LENGTH.unpack_from(data,offset)
+            offset += BINARY_LENGTH.size
+            if length == NO_PATH:
+                yield rank,None,None
+                continue
+            moves_end = offset+(length+3)//4
+            if moves_end > end:
+                raise ValueError('truncated record at byte {}'.format(offset))
+            yield rank,length,unpack_moves(data[offset:moves_end],length)
+            offset = moves_end
+
+    def __iter__(self):
+        for rank,length,actions in self.records():
+            tiles = unrank_pattern(rank,self.size,self.size)
+            start = np.array(tiles).reshape(self.rows,self.cols)
+            path = None
+            if actions is not None:
+                try:
+                    path = play_moves(tiles,actions,self.moves)
+                except ValueError as e:
+                    raise ValueError('record {}: {}'.format(rank,e)) from None
+            yield {'id':rank,'start':start,'goal':self.goal,'path':path}
+
+
+def jsonl_to_binary(f,out) -> int:
+    """
+    Converts the JSONL lines of an open file into records written to the open binary file out, returns the number of records.
+    Every line is an instance like those of read_instances, with its start and goal, and its path as in the results
+    of solve_instance ([[tile, action], ...], missing or with a status other than 'solved' if not solved):
+    the lines written by binary_to_jsonl. The results of the batch command have no states, they are rejected;
+    batch writes them as a binary file itself when its output ends with .bin.
+    Raises ValueError on the first line that cannot be converted.
+    """
+    with BinaryWriter(out) as writer:
+        for index,line in enumerate(f):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if 'start' not in record or 'goal' not in record:
+                raise ValueError('line {}: no start and goal, convert takes the instances with their path, '
+                                 'not batch results (run batch with a .bin output instead)'.format(index+1))
+            try:
+                instance = parse_instance(record,index)
+                path = record.get('path') if record.get('status','solved') == 'solved' else None
+                writer.write(instance['start'],instance['goal'],path)
+            except (KeyError,TypeError,ValueError) as e:
+                raise ValueError('line {}: {}'.format(index+1,e)) from e
+    return writer.count
+
+def binary_to_jsonl(path,out) -> int:
+    """Writes the records of the binary file at path as JSONL lines to the open file out, returns the number of records."""
+    count = 0
+    with BinaryReader(path) as reader:
+        goal = reader.goal.tolist()
+        for record in reader:
+            line = {'id':record['id'],'start':record['start'].tolist(),'goal':goal}
+            if record['path'] is None:
+                line['status'] = 'unsolved'
+            else:
+                line.update(status='solved',length=len(record['path']),path=[[tile,action] for tile,action in record['path']])
+            out.write(json.dumps(line)+'\n')
+            count += 1
+    return count
@@ -0,0 +1,158 @@
+"""Boards of the sliding puzzle: packed states, moves and solvability."""
+import functools
+import math
+
+import numpy as np
+
+
+#Constants, size of the default board
+BOARDWIDTH = 3 # number of columns in the board
+BOARDHEIGHT = 3 # number of rows in the board
+
+UP = 'up'
+DOWN = 'down'
+LEFT = 'left'
+RIGHT = 'right'
+
+# The search works on packed states: the board is stored in an integer,
+# tile_bits bits per cell in row major order, the blank being the value 0.
+class Board():
+    """
+    Geometry of a board of rows x cols cells and packing of its states.
+    Cell i of a state is stored in the bits [i*tile_bits,(i+1)*tile_bits) of the packed state,
+    tile_bits being the number of bits of the largest tile (4 up to the 4x4 board, 5 up to 5x6).
+    """
+    def __init__(self,rows,cols):
+        self.rows = rows
+        self.cols = cols
+        self.shape = (rows,cols)
+        self.size = rows*cols
+        self.tile_bits = max(1,(self.size-1).bit_length())
+        self.tile_mask = (1 << self.tile_bits)-1
+        self.cells = [(index,index*self.tile_bits) for index in range(self.size)] # (index, bit shift) of every cell
+        self.neighbors = self.build_neighbor_table()
+
+    def __repr__(self):
+        return 'Board({}x{})'.format(self.rows,self.cols)
+
+    def encode(self,state) -> int:
+        """Packs the board into an integer."""
+        code = 0
+        for value,(_,shift) in zip(np.asarray(state).ravel(),self.cells):
+            code |= int(value) << shift
+        return code
+
+    def decode(self,code):
+        """Unpacks an integer built by encode into a board."""
+        mask = self.tile_mask
+        return np.array([(code >> shift) & mask for _,shift in self.cells]).reshape(self.shape)
+
+    def tiles(self,code) -> list:
+        """Returns the tiles of a packed state in row major order."""
+        mask = self.tile_mask
+        return [(code >> shift) & mask for _,shift in self.cells]
+
+    def blank_index(self,code) -> int:
+        """Returns the cell index of the blank space in a packed state."""
+        mask = self.tile_mask
+        for index,shift in self.cells:
+            if not (code >> shift) & mask:
+                return index
+        raise ValueError('the state has no blank tile')
+
+    def build_neighbor_table(self) -> tuple:
+        """
+        For every index of the blank, the moves it allows as (index of the moved tile, bit shift of that tile, action),
+        in the order down, right, up, left (the action tells where the tile goes).
+        Moving a tile is then a swap of two fields of the packed state:
+        child = state ^ (tile << tile_shift) ^ (tile << blank_shift)
+        """
+        table = []
+        for blank in range(self.size):
+            blankx,blanky = divmod(blank,self.cols)
+            moves = []
+            for x,y,action in ((blankx-1,blanky,DOWN),(blankx,blanky-1,RIGHT),(blankx+1,blanky,UP),(blankx,blanky+1,LEFT)):
+                if 0 <= x < self.rows and 0 <= y < self.cols:
+                    moves.append((x*self.cols+y,(x*self.cols+y)*self.tile_bits,action))
+            table.append(tuple(moves))
+        return tuple(table)
+
+
+@functools.lru_cache(maxsize=None)
+def get_board(rows,cols) -> Board:
+    """Returns the board of the given size, built once."""
+    return Board(rows,cols)
+
+def encode_state(state) -> int:
+    """Packs the board into an integer, see Board."""
+    state = np.asarray(state)
+    return get_board(*state.shape).encode(state)
+
+def decode_state(code,shape=(BOARDHEIGHT,BOARDWIDTH)):
+    """Unpacks an integer built by encode_state into a board of the given shape."""
+    return get_board(*shape).decode(code)
+
+def goal_state(rows=BOARDHEIGHT,cols=BOARDWIDTH):
+    """Returns the usual goal state: the tiles in order, the blank in the last cell."""
+    return np.append(np.arange(1,rows*cols),0).reshape(rows,cols)
+
+
+class UnsolvablePuzzleError(ValueError):
+    """Raised when the goal state cannot be reached from the initial state."""
+
+
+def is_solvable(initial_state,goal_state) -> bool:
+    """
+    Tells in O(n) if goal_state can be reached from initial_state.
+    Every move swaps the blank with a neighbor tile: the permutation of the tiles changes its parity
+    and the blank gets one cell closer or further from its goal cell. So the goal is reachable only when
+    the parity of the permutation from the initial state to the goal state is the parity of the distance
+    of the blank to its goal cell. This is the usual rule on the inversion count, plus the row of the blank
+    on boards of even width.
+    """
+    initial_state = np.asarray(initial_state)
+    goal_state = np.asarray(goal_state)
+    if initial_state.shape != goal_state.shape:
+        raise ValueError('the initial state is {}x{} and the goal state {}x{}'.format(*initial_state.shape,*goal_state.shape))
+    size = initial_state.size
+    tiles = initial_state.ravel().tolist()
+    goal_tiles = goal_state.ravel().tolist()
+    if set(tiles) != set(range(size)) or set(goal_tiles) != set(range(size)):
+        raise ValueError('the states must hold every tile from 0 (the blank) to {} once'.format(size-1))
+    goal_cell = [0]*size # goal cell of every tile
+    for cell,tile in enumerate(goal_tiles):
+        goal_cell[tile] = cell
+    # the permutation sends every cell to the goal cell of its tile, its parity is (n - number of cycles) % 2
+    permutation = [goal_cell[tile] for tile in tiles]
+    seen = [False]*size
+    cycles = 0
+    for cell in range(size):
+        if not seen[cell]:
+            cycles += 1
+            while not seen[cell]:
+                seen[cell] = True
+                cell = permutation[cell]
+    cols = initial_state.shape[1]
+    blankx,blanky = divmod(tiles.index(0),cols)
+    goalx,goaly = divmod(goal_cell[0],cols)
+    return (size-cycles) % 2 == (abs(blankx-goalx)+abs(blanky-goaly)) % 2
+
+def check_solvable(initial_state,goal_state):
+    """Raises UnsolvablePuzzleError when goal_state cannot be reached from initial_state."""
+    if not is_solvable(initial_state,goal_state):
+        raise UnsolvablePuzzleError('the goal state cannot be reached from the initial state, the parity of the tiles differs')
+
+def parse_board(board,rows=None,cols=None):
+    """Returns the board as a 2d array, from nested lists, a flat list or a string of tiles."""
+    if isinstance(board,str):
+        board = board.split()
+    board = np.array(board,dtype=int)
+    if board.ndim == 2:
+        return board
+    if rows is None and cols is None:
+        rows = cols = math.isqrt(board.size)
+    elif rows is None:
+        rows = board.size//int(cols)
+    elif cols is None:
+        cols = board.size//int(rows)
+    return board.reshape(int(rows),int(cols))
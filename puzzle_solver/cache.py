@@ -0,0 +1,186 @@
+"""Cache of the optimal paths, shared by the symmetric instances and optionally saved in SQLite."""
+import collections
+import functools
+import sqlite3
+import time
+
+import numpy as np
+
+from .board import UP,DOWN,LEFT,RIGHT
+from .search import solve
+from .stats import SearchResult,SearchStats
+
+
+# Instances are cached under a canonical key. The tiles are named after their goal cell (label), so every goal
+# is reduced to the goal with the labels in order, and the instance is moved by the 8 symmetries of the rectangle
+# (transposing a non square board changes its shape), the smallest key being kept.
+# Every state of an optimal path is stored with the next move (next-move links): any suffix of an optimal path
+# is an optimal path to the same goal, so the states on the way are solved too.
+ACTION_VECTORS = {UP:(-1,0),DOWN:(1,0),LEFT:(0,-1),RIGHT:(0,1)} # move of the tile for every action
+VECTOR_ACTIONS = {vector:action for action,vector in ACTION_VECTORS.items()}
+CACHE_SIZE = 1000000 # max number of states kept in memory
+
+
+@functools.lru_cache(maxsize=None)
+def board_symmetries(rows,cols) -> tuple:
+    """
+    Returns the 8 symmetries of the board: transposition, then flips of the rows and of the columns.
+    A symmetry is (rows, cols, cells, actions): the shape of the image, the image of every cell and of every action.
+    """
+    symmetries = []
+    for transpose in (False,True):
+        new_rows,new_cols = (cols,rows) if transpose else (rows,cols)
+        for flip_rows in (False,True):
+            for flip_cols in (False,True):
+                cells = []
+                for cell in range(rows*cols):
+                    x,y = divmod(cell,cols)
+                    if transpose:
+                        x,y = y,x
+                    cells.append((new_rows-1-x if flip_rows else x)*new_cols+(new_cols-1-y if flip_cols else y))
+                actions = {}
+                for action,(dx,dy) in ACTION_VECTORS.items():
+                    if transpose:
+                        dx,dy = dy,dx
+                    actions[action] = VECTOR_ACTIONS[(-dx if flip_rows else dx),(-dy if flip_cols else dy)]
+                symmetries.append((new_rows,new_cols,tuple(cells),actions))
+    return tuple(symmetries)
+
+def canonical_key(tiles,goal_cell,rows,cols) -> tuple:
+    """
+    Returns (key, symmetry): the canonical key of the state given by its tiles in row major order,
+    goal_cell being the goal cell of every tile, and the symmetry moving the state to its canonical form.
+    """
+    labels = [goal_cell[tile] for tile in tiles]
+    blank_cell = goal_cell[0]
+    best = None
+    for symmetry in board_symmetries(rows,cols):
+        new_rows,new_cols,cells,_ = symmetry
+        image = [0]*len(cells)
+        for cell,label in enumerate(labels):
+            image[cells[cell]] = cells[label]
+        key = bytes([new_rows,new_cols,cells[blank_cell]]+image)
+        if best is None or key < best[0]:
+            best = (key,symmetry)
+    return best
+
+
+class SolutionCache():
+    """
+    LRU cache of the optimal paths, at most maxsize states in memory.
+    With a path, the states are also saved in a SQLite file, which survives restarts and can be shared by processes.
+    Every state is stored as canonical key -> (distance to the goal, label of the tile to move, action),
+    the label and the action being those of the canonical form.
+    """
+    def __init__(self,maxsize=CACHE_SIZE,path=None):
+        self.maxsize = maxsize
+        self.links = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path,timeout=30)
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute('CREATE TABLE IF NOT EXISTS links (key BLOB PRIMARY KEY, distance INTEGER, label INTEGER, action TEXT)')
+            self.db.commit()
+
+    def __len__(self):
+        return len(self.links)
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def link(self,key) -> tuple:
+        """Returns the (distance, label, action) of the key, None when it is not cached."""
+        link = self.links.get(key)
+        if link is not None:
+            self.links.move_to_end(key)
+            return link
+        if self.db is not None:
+            link = self.db.execute('SELECT distance, label, action FROM links WHERE key = ?',(key,)).fetchone()
+            if link is not None:
+                self.remember(key,link)
+        return link
+
+    def remember(self,key,link):
+        self.links[key] = link
+        self.links.move_to_end(key)
+        if len(self.links) > self.maxsize:
+            self.links.popitem(last=False)
+
+    def get(self,initial_state,goal_state) -> list:
+        """
+        Returns the cached optimal path from initial_state to goal_state as a list of (tile, action), None on a miss.
+        The path is followed from link to link, a missing link is a miss.
+        """
+        initial_state = np.asarray(initial_state)
+        rows,cols = initial_state.shape
+        tiles = [int(tile) for tile in initial_state.ravel()]
+        goal_tiles = [int(tile) for tile in np.asarray(goal_state).ravel()]
+        goal_cell = [0]*len(goal_tiles)
+        for cell,tile in enumerate(goal_tiles):
+            goal_cell[tile] = cell
+        path = []
+        distance = None
+        while tiles != goal_tiles:
+            key,(_,_,cells,actions) = canonical_key(tiles,goal_cell,rows,cols)
+            link = self.link(key)
+            if link is None or (distance is not None and link[0] != distance-1):
+                self.misses += 1
+                return None
+            distance,label,action = link
+            # back from the canonical form: the label is the image of a goal cell, the action the image of an action
+            tile = goal_tiles[cells.index(label)]
+            action = next(original for original,image in actions.items() if image == action)
+            index,blank = tiles.index(tile),tiles.index(0)
+            tiles[index],tiles[blank] = 0,tile
+            path.append((tile,action))
+        self.hits += 1
+        return path
+
+    def put(self,initial_state,goal_state,path):
+        """Caches an optimal path from initial_state to goal_state, with all the states on the way."""
+        initial_state = np.asarray(initial_state)
+        rows,cols = initial_state.shape
+        tiles = [int(tile) for tile in initial_state.ravel()]
+        goal_tiles = [int(tile) for tile in np.asarray(goal_state).ravel()]
+        goal_cell = [0]*len(goal_tiles)
+        for cell,tile in enumerate(goal_tiles):
+            goal_cell[tile] = cell
+        records = []
+        for step,(tile,action) in enumerate(path):
+            tile = int(tile)
+            key,(_,_,cells,actions) = canonical_key(tiles,goal_cell,rows,cols)
+            link = (len(path)-step,cells[goal_cell[tile]],actions[action])
+            self.remember(key,link)
+            records.append((key,)+link)
+            index,blank = tiles.index(tile),tiles.index(0)
+            tiles[index],tiles[blank] = 0,tile
+        if self.db is not None and records:
+            with self.db:
+                self.db.executemany('INSERT OR REPLACE INTO links VALUES (?, ?, ?, ?)',records)
+
+    def solve(self,initial_state,goal_state,heuristic_function='manhattan',mode=None,**options) -> SearchResult:
+        """
+        Returns the cached path, or solves the instance quietly and caches its path when it is optimal.
+        On a hit the stats only hold the time of the lookups. options are passed to solve.
+        Raises UnsolvablePuzzleError when the goal state cannot be reached.
+        """
+        start = time.perf_counter()
+        path = self.get(initial_state,goal_state)
+        if path is not None:
+            stats = SearchStats()
+            stats.search_time = time.perf_counter()-start
+            return SearchResult(path,stats)
+        path = solve(initial_state,goal_state,heuristic_function,mode,quiet=True,**options)
+        if path is not None and path.stats.suboptimality == 1:
+            self.put(initial_state,goal_state,path)
+        return path
+
+
+@functools.lru_cache(maxsize=None)
+def get_solution_cache(path=None) -> SolutionCache:
+    """Returns the cache of the process saved in the SQLite file at path, or kept in memory only."""
+    return SolutionCache(path=path)
@@ -0,0 +1,240 @@
+"""
+Command line of the solver: python -m puzzle_solver [gui|solve|batch|convert|serve|bench|build-pdb] ...
+The modules of a command are imported by its function, so that solve starts quickly:
+only the gui command imports pygame, only serve imports asyncio.
+"""
+import argparse
+import json
+import sys
+
+from .board import BOARDHEIGHT,BOARDWIDTH,UnsolvablePuzzleError,get_board,parse_board
+from .heuristics import HEURISTIC_FUNCTIONS
+from .pattern_database import check_patterns,default_patterns,load_pattern_database,parse_patterns
+from .search import SEARCH_MODES,BudgetExceededError,solve
+
+
+def gui_main(args):
+    from .visualizer import main
+    initial_state = parse_board(args.start,args.rows,args.cols) if args.start else None
+    goal_state = parse_board(args.goal,args.rows,args.cols) if args.goal else None
+    main(initial_state,goal_state,args.heuristic,args.mode)
+
+def search_options(args) -> dict:
+    """Returns the options of the search mode given on the command line."""
+    return {option:value for option,value in (('weight',args.weight),('time_limit',args.time_limit),('max_expansions',args.max_expansions),
+                                               ('beam_width',args.beam_width),('block_size',args.block_size),('patterns',args.patterns))
+            if value is not None}
+
+def solve_main(args):
+    initial_state = parse_board(args.start,args.rows,args.cols)
+    goal_state = parse_board(args.goal,args.rows,args.cols)
+    try:
+        if args.cache:
+            from .cache import SolutionCache
+            cache = SolutionCache(path=args.cache)
+            path = cache.solve(initial_state,goal_state,args.heuristic,args.mode,**search_options(args))
+            cache.close()
+        else:
+            path = solve(initial_state,goal_state,args.heuristic,args.mode,quiet=True,**search_options(args))
+    except (UnsolvablePuzzleError,BudgetExceededError,ValueError) as e:
+        sys.exit(str(e))
+    moves = [[int(tile),action] for tile,action in path]
+    print(json.dumps({'path':moves,'stats':path.stats.as_dict()} if args.stats else moves))
+
+def batch_main(args):
+    from .batch import read_instances,solve_batch
+    from .binary_io import BinaryWriter
+    format = args.format or ('csv' if args.input.endswith('.csv') else 'jsonl')
+    binary = args.output.endswith('.bin')
+    if binary and (args.input == '-' or args.unordered):
+        sys.exit('a binary output needs an input file and the results in input order')
+    
+    input_file = sys.stdin if args.input == '-' else open(args.input,newline='')
+    output_file = sys.stdout if args.output == '-' else open(args.output,'wb' if binary else 'w')
+    try:
+        results = solve_batch(read_instances(input_file,format),args.heuristic,args.mode,
+                              args.workers,args.chunksize,ordered=not args.unordered,cache=args.cache,
+                              options=search_options(args))
+        if binary:
+            # the records hold the initial states, read again from a second reader of the input
+            with BinaryWriter(output_file) as writer,open(args.input,newline='') as f:
+                for instance,result in zip(read_instances(f,format),results):
+                    try:
+                        writer.write(instance['start'],instance['goal'],result.get('path'))
+                    except ValueError as e:
+                        print('instance {} not written: {}'.format(instance['id'],e),file=sys.stderr)
+            return
+        for result in results:
+            output_file.write(json.dumps(result)+'\n')
+            output_file.flush()
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+def convert_main(args):
+    from .binary_io import binary_to_jsonl,jsonl_to_binary
+    if args.input.endswith('.bin'):
+        output_file = sys.stdout if args.output == '-' else open(args.output,'w')
+        try:
+            count = binary_to_jsonl(args.input,output_file)
+        except ValueError as e:
+            sys.exit(str(e))
+        finally:
+            if output_file is not sys.stdout:
+                output_file.close()
+    else:
+        input_file = sys.stdin if args.input == '-' else open(args.input)
+        try:
+            with open(args.output,'wb') as output_file:
+                count = jsonl_to_binary(input_file,output_file)
+        except ValueError as e:
+            sys.exit(str(e))
+        finally:
+            if input_file is not sys.stdin:
+                input_file.close()
+    print('{} records converted'.format(count),file=sys.stderr)
+
+def serve_main(args):
+    from .service import serve
+    settings = {setting:value for setting,value in (('queue_size',args.queue_size),('timeout',args.timeout)) if value is not None}
+    serve(args.socket,args.host,args.port,workers=args.workers,heuristic_function=args.heuristic,mode=args.mode,
+          cache=args.cache,**settings)
+
+def bench_main(args):
+    from .benchmark import benchmark,compare_reports,load_instance_set
+    try:
+        instance_sets = {name:load_instance_set(name,args.seed,args.per_depth,args.korf_file)[:args.limit] for name in args.sets}
+    except ValueError as e:
+        sys.exit(str(e))
+    def log(result):
+        print('{set} {heuristic} {mode}: {solved}/{instances} solved, median {median:.4f}s, {nodes_per_second:.0f} nodes/s'.format(
+            median=result['latency'].get('median',0.0),**result),file=sys.stderr)
+    repeats = {} if args.repeats is None else {'repeats':args.repeats}
+    noise_floor = {} if args.noise_floor is None else {'noise_floor':args.noise_floor}
+    report = benchmark(instance_sets,args.heuristics,args.modes,args.trace_memory,log,**repeats)
+    report['seed'] = args.seed
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['regressions'] = compare_reports(report,json.load(f),args.tolerance,**noise_floor)
+    if args.output == '-':
+        print(json.dumps(report,indent=1))
+    else:
+        with open(args.output,'w') as f:
+            json.dump(report,f,indent=1)
+    if report.get('regressions'):
+        sys.exit('{} regressions from the baseline'.format(len(report['regressions'])))
+
+def build_pdb_main(args):
+    board = get_board(args.rows,args.cols)
+    blank_cell = board.size-1 if args.blank_cell is None else args.blank_cell
+    patterns = default_patterns(board.rows,board.cols,blank_cell) if args.patterns is None else args.patterns
+    try:
+        check_patterns(patterns,board.size,blank_cell)
+    except ValueError as e:
+        sys.exit(str(e))
+    for labels in patterns:
+        load_pattern_database(board.rows,board.cols,blank_cell,tuple(labels))
+        print('pattern',' '.join(map(str,labels)),'ready')
+    if args.lookup:
+        from .lookup_table import load_lookup_table
+        load_lookup_table(board.rows,board.cols,blank_cell)
+        print('lookup table ready')
+
+
+def add_search_arguments(parser):
+    parser.add_argument('--heuristic',default='manhattan',choices=HEURISTIC_FUNCTIONS)
+    parser.add_argument('--mode',choices=sorted(SEARCH_MODES),help='search mode, A* up to 3x3 and IDA* above by default')
+    parser.add_argument('--weight',type=float,help='weight of h(n) in the weighted_a_star mode')
+    parser.add_argument('--time-limit',type=float,help='seconds of search, the weighted_a_star, ara_star and greedy modes return the best path so far, the other modes fail')
+    parser.add_argument('--max-expansions',type=int,help='expansions of the weighted_a_star, ara_star and greedy modes, the best path so far is returned')
+    parser.add_argument('--beam-width',type=int,help='states kept in every level of the vector_bfs mode, a beam search instead of a breadth first search')
+    parser.add_argument('--block-size',type=int,help='states expanded at once by the vector_a_star mode')
+    add_patterns_argument(parser,'partition of the tiles of the pattern_database heuristic instead of the default one')
+
+def add_patterns_argument(parser,help):
+    parser.add_argument('--patterns',type=parse_patterns,help=help+', the labels (goal cells of the tiles) of a pattern separated by commas '
+                        'and the patterns by slashes, like 0,1,4,5,8,12/2,3,6,7,10,11/9,13,14 on 4x4')
+
+def add_board_arguments(parser,required):
+    parser.add_argument('--start',required=required,help='initial state, tiles separated by spaces in row major order, 0 is the blank')
+    parser.add_argument('--goal',required=required,help='goal state, in the same format')
+    parser.add_argument('--rows',type=int,help='number of rows, a square board by default')
+    parser.add_argument('--cols',type=int,help='number of columns, a square board by default')
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='puzzle_solver',description='Sliding puzzle solver.')
+    commands = parser.add_subparsers(dest='command')
+    
+    gui = commands.add_parser('gui',help='solve an instance and show the board, the default command (needs pygame)')
+    add_board_arguments(gui,required=False)
+    gui.add_argument('--heuristic',default='num_misplaced',choices=HEURISTIC_FUNCTIONS)
+    gui.add_argument('--mode',choices=sorted(SEARCH_MODES),help='search mode, A* up to 3x3 and IDA* above by default')
+    gui.set_defaults(run=gui_main)
+    
+    solve = commands.add_parser('solve',help='solve an instance and print the path as JSON')
+    add_board_arguments(solve,required=True)
+    add_search_arguments(solve)
+    solve.add_argument('--cache',help='SQLite file caching the paths across runs')
+    solve.add_argument('--stats',action='store_true',help='print {"path": ..., "stats": ...} with the measures of the search')
+    solve.set_defaults(run=solve_main)
+    
+    batch = commands.add_parser('batch',help='solve the instances of a JSONL or CSV file')
+    batch.add_argument('input',help='JSONL or CSV file of instances, - for stdin')
+    batch.add_argument('-o','--output',default='-',help='JSONL file of the results, stdout by default, or a binary file of the paths (.bin)')
+    batch.add_argument('--format',choices=('jsonl','csv'),help='format of the input, guessed from its extension by default')
+    add_search_arguments(batch)
+    batch.add_argument('-j','--workers',type=int,help='number of worker processes, the number of cores by default')
+    batch.add_argument('--chunksize',type=int,default=16,help='number of instances sent to a worker at once')
+    batch.add_argument('--cache',help='SQLite file caching the paths across runs, shared by the workers')
+    batch.add_argument('--unordered',action='store_true',help='write the results as they are solved instead of in input order')
+    batch.set_defaults(run=batch_main)
+    
+    convert = commands.add_parser('convert',help='convert instances and paths between JSONL and the compact binary format (.bin)')
+    convert.add_argument('input',help='binary file (.bin), or JSONL file of instances with their start, goal and path, as written from a binary file (- for stdin)')
+    convert.add_argument('output',help='JSONL file (- for stdout) when the input is binary, else the binary file')
+    convert.set_defaults(run=convert_main)
+    
+    serve = commands.add_parser('serve',help='serve solve requests, JSON lines like the batch files, on a Unix socket or a local port')
+    serve.add_argument('--socket',help='path of the Unix socket, a TCP port is used if not given')
+    serve.add_argument('--host',default='127.0.0.1')
+    serve.add_argument('--port',type=int,default=8765)
+    serve.add_argument('--heuristic',default='manhattan',choices=HEURISTIC_FUNCTIONS,help='heuristic of the requests that do not give one')
+    serve.add_argument('--mode',choices=sorted(SEARCH_MODES),help='search mode of the requests that do not give one')
+    serve.add_argument('-j','--workers',type=int,help='number of worker processes, the number of cores by default')
+    serve.add_argument('--queue-size',type=int,help='max number of requests waiting for a worker, QUEUE_SIZE of the service by default')
+    serve.add_argument('--timeout',type=float,help='seconds before a request is answered with a timeout, REQUEST_TIMEOUT of the service by default')
+    serve.add_argument('--cache',help='SQLite file caching the paths, shared by the workers')
+    serve.set_defaults(run=serve_main)
+    
+    bench = commands.add_parser('bench',help='benchmark the searches on fixed instance sets and print a JSON report')
+    bench.add_argument('--sets',nargs='+',default=['random_3x3','hardest_3x3'],help='instance sets to run: random_3x3, hardest_3x3 or korf100 (see INSTANCE_SETS)')
+    bench.add_argument('--heuristics',nargs='+',default=['manhattan'],choices=HEURISTIC_FUNCTIONS)
+    bench.add_argument('--modes',nargs='+',default=[None],choices=sorted(SEARCH_MODES),help='search modes, the default of solve by default')
+    bench.add_argument('--seed',type=int,default=0,help='seed of the random instances')
+    bench.add_argument('--per-depth',type=int,default=10,help='number of random instances of every optimal depth')
+    bench.add_argument('--korf-file',help="file of Korf's 100 instances of the 15 puzzle, one instance per line")
+    bench.add_argument('--limit',type=int,help='only run the first instances of every set')
+    bench.add_argument('--trace-memory',action='store_true',help='measure the peak of Python allocations with tracemalloc (slower)')
+    bench.add_argument('--baseline',help='report of a previous run to compare with, the exit status is 1 on a regression')
+    bench.add_argument('--repeats',type=int,help='runs of every instance, the fastest one is kept (REPEATS by default)')
+    bench.add_argument('--tolerance',type=float,default=0.1,help='allowed slow down of the median latency, and growth of the memory peaks, from the baseline')
+    bench.add_argument('--noise-floor',type=float,help='seconds of slow down of the median latency that are never a regression (NOISE_FLOOR by default)')
+    bench.add_argument('-o','--output',default='-',help='JSON file of the report, stdout by default')
+    bench.set_defaults(run=bench_main)
+    
+    build_pdb = commands.add_parser('build-pdb',help='build the default pattern databases (and the lookup table) of a board ahead of time')
+    build_pdb.add_argument('--rows',type=int,default=BOARDHEIGHT)
+    build_pdb.add_argument('--cols',type=int,default=BOARDWIDTH)
+    build_pdb.add_argument('--blank-cell',type=int,help='goal cell of the blank, the last cell by default')
+    add_patterns_argument(build_pdb,'patterns to build instead of the default ones')
+    build_pdb.add_argument('--lookup',action='store_true',help='also build the lookup table of the lookup mode (boards up to 10 cells)')
+    build_pdb.set_defaults(run=build_pdb_main)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        args = build_parser().parse_args(['gui'])
+    args.run(args)
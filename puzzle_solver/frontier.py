@@ -0,0 +1,84 @@
+"""OPEN list of the A* search."""
+import array
+import heapq
+import itertools
+
+
+class Frontier():
+    """
+    The OPEN list of the A* search, kept as a binary heap, over the nodes of a NodeStore.
+
+    Each entry is a tuple (f, h, order, state) where f = depth + h, state being the packed state of the node.
+    The depth and the parent of a node are read from the NodeStore, the entry only holds what orders the heap.
+    Ties on f are broken on the lowest h (the deepest node), then on insertion order,
+    so the search expands nodes in a deterministic order.
+    The weights change f to depth_weight*depth + heuristic_weight*h, for weighted A* (heuristic_weight > 1)
+    and greedy best-first search (depth_weight = 0).
+
+    Pushing a node that is already in OPEN replaces its entry (decrease-key): the new entry is pushed
+    and the old one is left in the heap as stale, it is skipped when popped.
+    orders[id] is the order of the live entry of every node in OPEN, -1 for the other nodes.
+    The caller only pushes a node again when it has reached it with a lower depth, see the searches.
+    """
+    def __init__(self,nodes,depth_weight=1,heuristic_weight=1):
+        self.ids = nodes.ids
+        self.depth_weight = depth_weight
+        self.heuristic_weight = heuristic_weight
+        self.heap = []
+        self.orders = array.array('q')
+        self.size = 0
+        self.counter = itertools.count()
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self,node):
+        return node < len(self.orders) and self.orders[node] >= 0
+
+    def push(self,node,state,depth,heuristic_cost,f_score=None):
+        """
+        Adds the node of the packed state to OPEN, replacing its entry when it is already there.
+        f_score replaces depth_weight*depth + heuristic_weight*heuristic_cost when given.
+        """
+        orders = self.orders
+        if node >= len(orders):
+            orders.extend(array.array('q',(-1,))*(max(node+1,2*len(orders))-len(orders)))
+        if orders[node] < 0:
+            self.size += 1
+        order = orders[node] = next(self.counter)
+        if f_score is None:
+            f_score = self.depth_weight*depth+self.heuristic_weight*heuristic_cost
+        heapq.heappush(self.heap,(f_score,heuristic_cost,order,state))
+
+    def peek(self):
+        """
+        Returns the entry with the lowest f without removing it, dropping the stale entries on top.
+        """
+        heap,ids,orders = self.heap,self.ids,self.orders
+        while heap:
+            entry = heap[0]
+            if orders[ids[entry[3]]] == entry[2]:
+                return entry
+            heapq.heappop(heap)
+        raise IndexError('peek at an empty frontier')
+
+    def live_entries(self):
+        """Yields the entries of the nodes in OPEN, in no particular order."""
+        ids,orders = self.ids,self.orders
+        for entry in self.heap:
+            if orders[ids[entry[3]]] == entry[2]:
+                yield entry
+
+    def pop(self):
+        """
+        Removes and returns the entry with the lowest f, skipping the stale entries.
+        """
+        heap,ids,orders = self.heap,self.ids,self.orders
+        while heap:
+            entry = heapq.heappop(heap)
+            node = ids[entry[3]]
+            if orders[node] == entry[2]:
+                orders[node] = -1
+                self.size -= 1
+                return entry
+        raise IndexError('pop from an empty frontier')
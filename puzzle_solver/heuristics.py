@@ -0,0 +1,76 @@
+"""Heuristic costs of the packed states, precomputed for a goal state."""
+import functools
+
+from .pattern_database import PatternDatabaseHeuristic,parse_patterns,pattern_heuristic
+
+
+# Heuristics are precomputed for the goal state as a table cost[tile][index]:
+# the cost of the tile when it is at the cell index, the blank costs nothing.
+def misplaced_cost_table(board,goal_code) -> list:
+    """Number of misplaced tiles: a tile costs 1 anywhere but on its goal cell."""
+    cost = [[0]*board.size for _ in range(board.size)]
+    for goal_index,tile in enumerate(board.tiles(goal_code)):
+        if tile:
+            cost[tile] = [int(index != goal_index) for index in range(board.size)]
+    return cost
+
+def manhattan_cost_table(board,goal_code) -> list:
+    """Sum of Manhattan distances: a tile costs its distance to its goal cell."""
+    cost = [[0]*board.size for _ in range(board.size)]
+    for goal_index,tile in enumerate(board.tiles(goal_code)):
+        if tile:
+            goalx,goaly = divmod(goal_index,board.cols)
+            cost[tile] = [abs(x-goalx)+abs(y-goaly) for x,y in (divmod(index,board.cols) for index in range(board.size))]
+    return cost
+
+HEURISTICS = {'num_misplaced':misplaced_cost_table,'manhattan':manhattan_cost_table}
+
+
+class HeuristicTable():
+    """
+    Heuristic cost of the packed states for one goal state.
+    h(n) is the sum of cost[tile][index] over the tiles. A move changes the cell of one tile only,
+    so the cost of a child is computed in O(1) from the cost of its parent.
+    """
+    def __init__(self,board,cost):
+        self.board = board
+        self.cost = cost
+
+    def __call__(self,code) -> int:
+        cost = self.cost
+        return sum(cost[tile][index] for index,tile in enumerate(self.board.tiles(code)))
+
+    def child_cost(self,h,child,tile,from_index,to_index) -> int:
+        """Cost of child, reached by moving tile from from_index to to_index in a state of cost h."""
+        tile_cost = self.cost[tile]
+        return h+tile_cost[to_index]-tile_cost[from_index]
+
+@functools.lru_cache(maxsize=64)
+def get_heuristic(board,goal_code,heuristic_function) -> HeuristicTable:
+    """
+    Returns the user specified heuristic for the goal state, built once per goal.
+    'pattern_database:' followed by a spec of parse_patterns gives the pattern databases of that partition.
+    """
+    if heuristic_function == 'pattern_database':
+        return PatternDatabaseHeuristic(board,goal_code)
+    if isinstance(heuristic_function,str) and heuristic_function.startswith('pattern_database:'):
+        return PatternDatabaseHeuristic(board,goal_code,parse_patterns(heuristic_function.partition(':')[2]))
+    if heuristic_function not in HEURISTICS:
+        raise ValueError('unknown heuristic function: {}'.format(heuristic_function))
+    return HeuristicTable(board,HEURISTICS[heuristic_function](board,goal_code))
+
+def reverse_heuristic(board,goal_code,start_code,heuristic_function) -> str:
+    """
+    Returns the heuristic function of a search from goal_code to start_code with the partition of heuristic_function:
+    the labels of a pattern_database partition are goal cells, the goal cells of the blank are swapped.
+    Any partition is admissible, so the tables only depend on the cell of the blank in start_code
+    and are shared by the instances.
+    """
+    if not (isinstance(heuristic_function,str) and heuristic_function.startswith('pattern_database:')):
+        return heuristic_function
+    goal_blank,start_blank = board.blank_index(goal_code),board.blank_index(start_code)
+    swap = {goal_blank:start_blank,start_blank:goal_blank}
+    patterns = parse_patterns(heuristic_function.partition(':')[2])
+    return pattern_heuristic([[swap.get(label,label) for label in labels] for labels in patterns])
+
+HEURISTIC_FUNCTIONS = tuple(sorted(HEURISTICS))+('pattern_database',) # every name accepted by get_heuristic
@@ -0,0 +1,159 @@
+"""Lookup table of the whole state space of the small boards: the distance and the best move of every state."""
+import collections
+import functools
+import math
+import mmap
+import os
+import struct
+
+from .board import UP,DOWN,LEFT,RIGHT
+from .pattern_database import PDB_DIR,build_lock,cell_neighbors,rank_pattern,unrank_pattern,write_table
+
+
+# The table is built by one BFS from the goal. Like the exact pattern database, the tiles are named after
+# their goal cell and a state is ranked by the cells of the blank and of all the tiles but the last 2
+# (given by the parity), so one table of n!/2 entries serves every goal with the same goal cell of the blank.
+# An entry is one byte: distance << 2 | move, move being the direction of the tile to move next
+# (LOOKUP_ACTIONS), 0xFF when the state cannot be reached.
+LOOKUP_MAGIC = b'SLUT'
+LOOKUP_VERSION = 1
+LOOKUP_HEADER = struct.Struct('<4sBBBB') # magic, version, rows, cols, blank goal cell
+LOOKUP_UNREACHED = 0xFF
+LOOKUP_MAX_CELLS = 10 # 10!/2 entries at most, and the distances must fit in 6 bits
+LOOKUP_ACTIONS = (DOWN,RIGHT,UP,LEFT) # the order of the neighbor table of Board
+
+
+def lookup_labels(size,blank_cell) -> list:
+    """Returns the labels ranked in the table: the blank first, then all the tiles but the last 2."""
+    return [blank_cell]+[cell for cell in range(size) if cell != blank_cell][:-2]
+
+def move_offsets(cols) -> tuple:
+    """Returns the offset from the blank of the tile moved by every action of LOOKUP_ACTIONS."""
+    return (-cols,-1,cols,1)
+
+def build_lookup_table(rows,cols,blank_cell) -> bytearray:
+    """BFS from the goal over the whole state space, returns one entry per rank."""
+    size = rows*cols
+    if size > LOOKUP_MAX_CELLS or min(rows,cols) < 2:
+        raise ValueError('no lookup table for the {}x{} board, the state space is too large'.format(rows,cols))
+    labels = lookup_labels(size,blank_cell)
+    k = len(labels)
+    neighbors = cell_neighbors(rows,cols)
+    action_of = {offset:move for move,offset in enumerate(move_offsets(cols))}
+    table = bytearray([LOOKUP_UNREACHED])*math.perm(size,k)
+    start = rank_pattern(labels,size)
+    table[start] = 0
+    queue = collections.deque([start])
+    while queue:
+        rank = queue.popleft()
+        distance = (table[rank] >> 2)+1
+        positions = unrank_pattern(rank,size,k)
+        blank = positions[0]
+        for cell in neighbors[blank]:
+            moved = positions.copy()
+            moved[0] = cell
+            if cell in positions:
+                moved[positions.index(cell)] = blank
+            child = rank_pattern(moved,size)
+            if table[child] == LOOKUP_UNREACHED:
+                # the tile that went from cell to blank goes back from blank to cell
+                table[child] = distance << 2 | action_of[blank-cell]
+                queue.append(child)
+    return table
+
+def lookup_table_path(rows,cols,blank_cell) -> str:
+    return os.path.join(PDB_DIR,'{}x{}-b{}.lut'.format(rows,cols,blank_cell))
+
+def save_lookup_table(path,rows,cols,blank_cell,table):
+    """Writes the header and the table, the file is replaced atomically."""
+    write_table(path,LOOKUP_HEADER.pack(LOOKUP_MAGIC,LOOKUP_VERSION,rows,cols,blank_cell),table)
+
+
+class LookupTable():
+    """A lookup table file mapped in memory, table[rank] is the entry of the state ranked by rank."""
+    def __init__(self,path):
+        with open(path,'rb') as f:
+            self.data = mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ)
+        magic,version,self.rows,self.cols,self.blank_cell = LOOKUP_HEADER.unpack_from(self.data)
+        if magic != LOOKUP_MAGIC or version != LOOKUP_VERSION:
+            raise ValueError('{} is not a lookup table'.format(path))
+        self.offset = LOOKUP_HEADER.size
+        size = self.rows*self.cols
+        if len(self.data)-self.offset != math.perm(size,size-2):
+            raise ValueError('{} is truncated'.format(path))
+
+    def __getitem__(self,rank) -> int:
+        return self.data[self.offset+rank]
+
+
+@functools.lru_cache(maxsize=None)
+def load_lookup_table(rows,cols,blank_cell) -> LookupTable:
+    """Loads the lookup table of the board, it is built and saved in PDB_DIR the first time."""
+    path = lookup_table_path(rows,cols,blank_cell)
+    if not os.path.exists(path):
+        with build_lock(path):
+            if not os.path.exists(path): # built by another process while waiting for the lock
+                save_lookup_table(path,rows,cols,blank_cell,build_lookup_table(rows,cols,blank_cell))
+    return LookupTable(path)
+
+
+class LookupSolver():
+    """
+    Optimal paths to one goal state read from the lookup table, without search.
+    Called on a packed state it returns the exact distance, so it is also a perfect heuristic.
+    """
+    def __init__(self,board,goal_code):
+        self.board = board
+        self.size = board.size
+        self.label = [0]*board.size # goal cell of every tile
+        for cell,tile in enumerate(board.tiles(goal_code)):
+            self.label[tile] = cell
+        self.labels = lookup_labels(board.size,self.label[0])
+        self.table = load_lookup_table(board.rows,board.cols,self.label[0])
+        self.offsets = move_offsets(board.cols)
+
+    def positions(self,code) -> list:
+        """Returns the cell of every label."""
+        positions = [0]*self.size
+        label = self.label
+        for cell,tile in enumerate(self.board.tiles(code)):
+            positions[label[tile]] = cell
+        return positions
+
+    def entry(self,positions) -> int:
+        return self.table[rank_pattern([positions[label] for label in self.labels],self.size)]
+
+    def __call__(self,code) -> int:
+        entry = self.entry(self.positions(code))
+        if entry == LOOKUP_UNREACHED:
+            raise ValueError('the state cannot reach the goal state')
+        return entry >> 2
+
+    def child_cost(self,h,child,tile,from_index,to_index) -> int:
+        return self(child)
+
+    def walk(self,code) -> list:
+        """Returns the steps of an optimal path from the packed state to the goal, as (packed state, moved tile, action)."""
+        board = self.board
+        tile_bits,tile_mask = board.tile_bits,board.tile_mask
+        positions = self.positions(code)
+        blank = positions[self.label[0]]
+        steps = []
+        entry = self.entry(positions)
+        if entry == LOOKUP_UNREACHED:
+            raise ValueError('the state cannot reach the goal state')
+        while entry >> 2:
+            move = entry & 3
+            index = blank+self.offsets[move]
+            tile = (code >> index*tile_bits) & tile_mask
+            code ^= (tile << index*tile_bits) ^ (tile << blank*tile_bits)
+            positions[self.label[tile]] = blank
+            positions[self.label[0]] = blank = index
+            steps.append((code,tile,LOOKUP_ACTIONS[move]))
+            entry = self.entry(positions)
+        return steps
+
+@functools.lru_cache(maxsize=64)
+def get_lookup_solver(board,goal_code) -> LookupSolver:
+    """Returns the lookup solver of the goal state, built once per goal."""
+    return LookupSolver(board,goal_code)
@@ -0,0 +1,70 @@
+"""Search nodes stored as a struct of arrays."""
+import array
+import itertools
+
+
+class NodeStore():
+    """
+    The nodes reached by a search, indexed by node id: the id of the parent (-1 for a root), the depth,
+    the index of the blank and a flag telling if the node was expanded, each in a flat array.
+    ids maps a packed state to its id. The ids are given in the order the states are added and dicts keep
+    that order, so the packed states are not stored again: the state of a node is found from its position in ids.
+    The moved tile and the action are not stored, they are found again from the states when the path is traced back.
+    A node costs a dict entry and 10 bytes of arrays.
+    """
+    __slots__ = ('ids','parents','depths','blanks','closed')
+
+    def __init__(self):
+        self.ids = {}
+        self.parents = array.array('i')
+        self.depths = array.array('i')
+        self.blanks = bytearray()
+        self.closed = bytearray()
+
+    def __len__(self):
+        return len(self.depths)
+
+    def add(self,state,parent,depth,blank) -> int:
+        """Adds the node of a state not reached yet, with the index of its blank, returns its id."""
+        node = len(self.depths)
+        self.ids[state] = node
+        self.parents.append(parent)
+        self.depths.append(depth)
+        self.blanks.append(blank)
+        self.closed.append(0)
+        return node
+
+    def states(self,nodes) -> dict:
+        """Returns the packed states of the node ids of nodes, a dict id -> state, scanning ids up to the last one."""
+        nodes = set(nodes)
+        return {node:state for node,state in enumerate(itertools.islice(self.ids,max(nodes)+1)) if node in nodes}
+
+    def path_nodes(self,node) -> list:
+        """Returns the ids of the nodes from the node to its root, following the parents."""
+        parents = self.parents
+        path = [node]
+        while parents[node] >= 0:
+            node = parents[node]
+            path.append(node)
+        return path
+
+    def move(self,board,state,parent_state) -> tuple:
+        """Returns the (moved tile, action) leading from parent_state to state."""
+        blank,parent_blank = board.blank_index(state),board.blank_index(parent_state)
+        tile = (state >> parent_blank*board.tile_bits) & board.tile_mask
+        action = next(action for index,_,action in board.neighbors[parent_blank] if index == blank)
+        return tile,action
+
+    def steps(self,board,node) -> list:
+        """Returns the steps from the root to the node, as (packed state, moved tile, action)."""
+        return [(state,)+self.move(board,state,parent_state) for parent_state,state in self.path_states(node)[::-1]]
+
+    def steps_to_root(self,board,node) -> list:
+        """Returns the steps from the node to the root, following the parents, as (packed state, moved tile, action)."""
+        return [(parent_state,)+self.move(board,parent_state,state) for parent_state,state in self.path_states(node)]
+
+    def path_states(self,node) -> list:
+        """Returns the (parent state, state) of every node from the node to its root, the root excluded."""
+        path = self.path_nodes(node)
+        states = self.states(path)
+        return [(states[parent],states[child]) for child,parent in zip(path,path[1:])]
@@ -0,0 +1,298 @@
+"""Pattern database heuristic, the tables are built by retrograde BFS and mapped in memory."""
+import collections
+import contextlib
+import functools
+import math
+import mmap
+import os
+import struct
+import tempfile
+
+try:
+    import fcntl
+except ImportError: # Unix only, the processes then build the missing tables each on their own
+    fcntl = None
+
+
+# Pattern databases: the exact number of moves needed to bring a subset of the tiles (the pattern)
+# to their goal cells, for every placement of those tiles. The tiles are named after their goal cell (label),
+# so a database depends on the board, the goal cell of the blank and the pattern, not on the goal state.
+# When the blank is part of the pattern and the pattern holds all but 2 tiles, the database is the exact
+# distance to the goal (the 2 remaining tiles are given by the parity), there are n!/2 entries.
+# Otherwise the pattern has no blank, only the moves of its tiles are counted and the databases of
+# disjoint patterns can be added (additive pattern databases).
+PDB_DIR = os.environ.get('PUZZLE_PDB_DIR',os.path.join(os.path.dirname(os.path.abspath(__file__)),'pattern_databases'))
+PDB_MAGIC = b'SPDB'
+PDB_VERSION = 1
+PDB_HEADER = struct.Struct('<4sBBBBB') # magic, version, rows, cols, blank goal cell, pattern length, then the labels
+PDB_UNREACHED = 0xFF
+PDB_MODE = 0o644 # the tables are shared by the users of PDB_DIR
+PARENT_CACHE_SIZE = 4096 # states of a PatternDatabaseHeuristic kept with the cells of their labels and their ranks
+
+
+def rank_pattern(positions,size) -> int:
+    """Ranks the cells of the pattern tiles (k distinct cells out of size) in [0, size!/(size-k)!)."""
+    rank = 0
+    used = 0
+    for i,cell in enumerate(positions):
+        rank = rank*(size-i)+cell-(used & ((1 << cell)-1)).bit_count()
+        used |= 1 << cell
+    return rank
+
+def unrank_pattern(rank,size,k) -> list:
+    """Inverse of rank_pattern."""
+    digits = []
+    for i in range(k-1,-1,-1):
+        rank,digit = divmod(rank,size-i)
+        digits.append(digit)
+    free = list(range(size))
+    return [free.pop(digit) for digit in reversed(digits)]
+
+def cell_neighbors(rows,cols) -> list:
+    """Returns the cells next to every cell of the board."""
+    return [[x*cols+y for x,y in ((cellx-1,celly),(cellx,celly-1),(cellx+1,celly),(cellx,celly+1)) if 0 <= x < rows and 0 <= y < cols]
+            for cellx,celly in (divmod(cell,cols) for cell in range(rows*cols))]
+
+def default_patterns(rows,cols,blank_cell) -> list:
+    """
+    Exact database up to 3x3, above the tiles are split in row major order into disjoint patterns
+    of 5 tiles for the 4x4 board (5-5-5) and of 4 tiles for larger boards.
+    """
+    size = rows*cols
+    cells = [cell for cell in range(size) if cell != blank_cell]
+    if size <= 9:
+        return [sorted(cells[:-2]+[blank_cell])]
+    group = 5 if size <= 16 else 4
+    return [cells[i:i+group] for i in range(0,len(cells),group)]
+
+def check_patterns(patterns,size,blank_cell):
+    """
+    Raises ValueError unless the patterns are disjoint sets of labels of the board: additive patterns without
+    the blank, or a single pattern with the blank.
+    """
+    labels = [label for pattern in patterns for label in pattern]
+    if not patterns or not all(patterns):
+        raise ValueError('the patterns must not be empty')
+    if any(not 0 <= label < size for label in labels):
+        raise ValueError('the labels of the patterns are cells, from 0 to {}'.format(size-1))
+    if len(set(labels)) != len(labels):
+        raise ValueError('the patterns must be disjoint')
+    if blank_cell in labels and len(patterns) > 1:
+        raise ValueError('a pattern with the blank cannot be added to other patterns')
+
+def parse_patterns(spec) -> list:
+    """Returns the patterns of a spec like '0,1,4,5/2,3,6,7': the labels separated by commas, the patterns by slashes."""
+    return [tuple(int(label) for label in pattern.split(',')) for pattern in spec.split('/')]
+
+def pattern_heuristic(patterns) -> str:
+    """Returns the heuristic name of the pattern databases of a partition, 'pattern_database:' and its spec."""
+    return 'pattern_database:'+'/'.join(','.join(str(label) for label in pattern) for pattern in patterns)
+
+def build_pattern_database(rows,cols,blank_cell,labels) -> bytearray:
+    """
+    Retrograde BFS from the goal over the placements of the pattern tiles.
+    Returns one byte per ranked placement: the number of moves from the goal, PDB_UNREACHED if none.
+    """
+    size = rows*cols
+    k = len(labels)
+    neighbors = cell_neighbors(rows,cols)
+    table = bytearray([PDB_UNREACHED])*(math.perm(size,k))
+    if blank_cell in labels:
+        # the blank is tracked, every move counts
+        slot = labels.index(blank_cell)
+        start = rank_pattern(labels,size)
+        table[start] = 0
+        queue = collections.deque([start])
+        while queue:
+            rank = queue.popleft()
+            distance = table[rank]+1
+            positions = unrank_pattern(rank,size,k)
+            blank = positions[slot]
+            for cell in neighbors[blank]:
+                moved = positions.copy()
+                moved[slot] = cell
+                if cell in positions:
+                    moved[positions.index(cell)] = blank
+                child = rank_pattern(moved,size)
+                if table[child] == PDB_UNREACHED:
+                    table[child] = distance
+                    queue.append(child)
+        return table
+    # the blank is not tracked: 0-1 BFS over (placement, blank cell), moving a tile out of the pattern is free
+    distances = bytearray([PDB_UNREACHED])*(len(table)*size)
+    start = rank_pattern(labels,size)*size+blank_cell
+    distances[start] = 0
+    queue = collections.deque([start])
+    while queue:
+        key = queue.popleft()
+        distance = distances[key]
+        rank,blank = divmod(key,size)
+        if table[rank] == PDB_UNREACHED:
+            table[rank] = distance # states are popped by increasing distance, the first one is the closest
+        positions = unrank_pattern(rank,size,k)
+        for cell in neighbors[blank]:
+            if cell in positions:
+                moved = positions.copy()
+                moved[positions.index(cell)] = blank
+                child = rank_pattern(moved,size)*size+cell
+                if distance+1 < distances[child]:
+                    distances[child] = distance+1
+                    queue.append(child)
+            else:
+                child = rank*size+cell
+                if distance < distances[child]:
+                    distances[child] = distance
+                    queue.appendleft(child)
+    return table
+
+def pattern_database_path(rows,cols,blank_cell,labels) -> str:
+    return os.path.join(PDB_DIR,'{}x{}-b{}-{}.pdb'.format(rows,cols,blank_cell,'.'.join(map(str,labels))))
+
+def write_table(path,header,table):
+    """Writes the header and the table to a temporary file of its own, then replaces the file at path atomically."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory,exist_ok=True)
+    fd,temp_path = tempfile.mkstemp(dir=directory,prefix=os.path.basename(path)+'.',suffix='.tmp')
+    try:
+        with os.fdopen(fd,'wb') as f:
+            f.write(header)
+            f.write(table)
+        os.chmod(temp_path,PDB_MODE) # mkstemp creates the file readable by its owner only
+        os.replace(temp_path,path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+@contextlib.contextmanager
+def build_lock(path):
+    """
+    Holds an exclusive lock on path+'.lock' while the table at path is built: the processes missing the same table
+    (the workers of a batch on a cold PDB_DIR) wait for the first one to build it, then find the file.
+    The lock file is removed once the table is there: the processes coming later find the table and take no lock.
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or '.',exist_ok=True)
+    lock_path = path+'.lock'
+    with open(lock_path,'a') as lock:
+        fcntl.flock(lock,fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.path.exists(path):
+                with contextlib.suppress(FileNotFoundError): # removed by a process that waited for the same lock
+                    os.unlink(lock_path)
+            fcntl.flock(lock,fcntl.LOCK_UN)
+
+def save_pattern_database(path,rows,cols,blank_cell,labels,table):
+    """Writes the header and the table, the file is replaced atomically."""
+    write_table(path,PDB_HEADER.pack(PDB_MAGIC,PDB_VERSION,rows,cols,blank_cell,len(labels))+bytes(labels),table)
+
+
+class PatternDatabase():
+    """
+    A pattern database file mapped in memory, processes using the same file share its pages.
+    db[rank] is the number of moves for the placement ranked by rank_pattern.
+    """
+    def __init__(self,path):
+        with open(path,'rb') as f:
+            self.data = mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ)
+        magic,version,self.rows,self.cols,self.blank_cell,k = PDB_HEADER.unpack_from(self.data)
+        if magic != PDB_MAGIC or version != PDB_VERSION:
+            raise ValueError('{} is not a pattern database'.format(path))
+        self.labels = list(self.data[PDB_HEADER.size:PDB_HEADER.size+k])
+        self.offset = PDB_HEADER.size+k
+        if len(self.data)-self.offset != math.perm(self.rows*self.cols,k):
+            raise ValueError('{} is truncated'.format(path))
+
+    def __getitem__(self,rank) -> int:
+        return self.data[self.offset+rank]
+
+
+@functools.lru_cache(maxsize=None)
+def load_pattern_database(rows,cols,blank_cell,labels) -> PatternDatabase:
+    """Loads the database of the pattern, it is built and saved in PDB_DIR the first time."""
+    path = pattern_database_path(rows,cols,blank_cell,labels)
+    if not os.path.exists(path):
+        with build_lock(path):
+            if not os.path.exists(path): # built by another process while waiting for the lock
+                save_pattern_database(path,rows,cols,blank_cell,labels,build_pattern_database(rows,cols,blank_cell,list(labels)))
+    return PatternDatabase(path)
+
+
+class PatternDatabaseHeuristic():
+    """
+    Heuristic cost read from pattern databases: the exact distance, or the sum of disjoint additive databases.
+    patterns are lists of labels (goal cells of the tiles), default_patterns by default, see check_patterns.
+    With additive databases a move changes the entry of the pattern of the moved tile only. The cost of a child
+    is found from the cells of the labels and the ranks of its parent, kept with those of the last children costed
+    (up to PARENT_CACHE_SIZE states, the next parents are among them): only the pattern of the moved tile is ranked.
+    """
+    def __init__(self,board,goal_code,patterns=None):
+        self.board = board
+        self.size = board.size
+        self.label = [0]*board.size # goal cell of every tile
+        for cell,tile in enumerate(board.tiles(goal_code)):
+            self.label[tile] = cell
+        blank_cell = self.label[0]
+        if patterns is None:
+            patterns = default_patterns(board.rows,board.cols,blank_cell)
+        check_patterns(patterns,board.size,blank_cell)
+        self.databases = [(load_pattern_database(board.rows,board.cols,blank_cell,tuple(labels)),tuple(labels)) for labels in patterns]
+        self.additive = all(blank_cell not in labels for labels in patterns)
+        self.pattern_of = [None]*board.size # database of every label
+        self.slot = [None]*board.size # index of every label in its pattern
+        for i,(_,labels) in enumerate(self.databases):
+            for slot,label in enumerate(labels):
+                self.pattern_of[label],self.slot[label] = i,slot
+        self.blank_slot = None if self.additive else self.slot[blank_cell]
+        self.shifts = [shift for _,shift in board.cells]
+        self.parents = {} # packed state -> (cells of the labels of every pattern, rank of every pattern)
+
+    def positions(self,code) -> list:
+        """Returns the cell of every label."""
+        positions = [0]*self.size
+        label = self.label
+        for cell,tile in enumerate(self.board.tiles(code)):
+            positions[label[tile]] = cell
+        return positions
+
+    def __call__(self,code) -> int:
+        positions = self.positions(code)
+        return sum(db[rank_pattern([positions[label] for label in labels],self.size)] for db,labels in self.databases)
+
+    def parent_ranks(self,parent) -> tuple:
+        """Returns the cells of the labels of every pattern and the rank of every pattern of a parent state."""
+        entry = self.parents.get(parent)
+        if entry is None:
+            positions = self.positions(parent)
+            cells = tuple([positions[label] for label in labels] for _,labels in self.databases)
+            entry = self.cache(parent,cells,tuple(rank_pattern(pattern_cells,self.size) for pattern_cells in cells))
+        return entry
+
+    def cache(self,code,cells,ranks) -> tuple:
+        """Keeps the cells and the ranks of a state, the next parents of the search are among the last children."""
+        if len(self.parents) >= PARENT_CACHE_SIZE:
+            self.parents.clear()
+        entry = self.parents[code] = (cells,ranks)
+        return entry
+
+    def child_cost(self,h,child,tile,from_index,to_index) -> int:
+        """Cost of child, reached by moving tile from from_index to to_index in a state of cost h."""
+        label = self.label[tile]
+        pattern = self.pattern_of[label] if self.additive else 0 # the blank moves in the pattern of an exact database
+        shifts = self.shifts
+        cells,ranks = self.parent_ranks(child ^ (tile << shifts[from_index]) ^ (tile << shifts[to_index]))
+        if pattern is None:
+            self.cache(child,cells,ranks)
+            return h
+        pattern_cells = cells[pattern].copy()
+        if self.pattern_of[label] is not None:
+            pattern_cells[self.slot[label]] = to_index
+        if self.blank_slot is not None:
+            pattern_cells[self.blank_slot] = from_index
+        rank = rank_pattern(pattern_cells,self.size)
+        self.cache(child,cells[:pattern]+(pattern_cells,)+cells[pattern+1:],ranks[:pattern]+(rank,)+ranks[pattern+1:])
+        db = self.databases[pattern][0]
+        return h-db[ranks[pattern]]+db[rank]
@@ -0,0 +1,928 @@
+"""Search nodes, the A*, IDA*, bidirectional and bounded-suboptimal searches and the lookup table walk."""
+import math
+import time
+
+import numpy as np
+
+from .board import UP,DOWN,LEFT,RIGHT,get_board,decode_state,check_solvable
+from .frontier import Frontier
+from .heuristics import get_heuristic,reverse_heuristic
+from .lookup_table import get_lookup_solver
+from .node_store import NodeStore
+from .pattern_database import pattern_heuristic
+from .stats import SearchResult,SearchStats
+from .vectorized import VectorFrontier,VectorNodes,get_vector_board,get_vector_heuristic,unique_children
+
+
+FOUND = object() # returned by the depth first search of IDA* when the goal state is found
+TRANSPOSITION_TABLE_SIZE = 1000000 # max number of states recorded by IDA* during an iteration
+WEIGHT = 2.0 # weight of h(n) in weighted A*
+ARA_WEIGHTS = (3.0,2.5,2.0,1.5,1.0) # weights of the successive searches of ARA*
+BLOCK_SIZE = 2048 # states expanded at once by the batched A* of the vector_a_star mode
+DEADLINE_CHECK = 1024 # expansions between two checks of the time limit, in the searches expanding one state at a time
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised when the time or expansion budget of a search runs out before any path is found."""
+
+def check_deadline(deadline,expansions):
+    """Raises BudgetExceededError when the time limit of a search has run out, deadline being a time.perf_counter()."""
+    if time.perf_counter() >= deadline:
+        raise BudgetExceededError('the time limit ran out after {} expansions, before any path was found'.format(expansions))
+
+
+def join_steps(board,forward_nodes,backward_nodes,meet) -> list:
+    """
+    Returns the steps of the path from the root of forward_nodes to the root of backward_nodes through the state meet,
+    as (packed state, moved tile, action). The moves of the backward search are undone in reverse order.
+    """
+    return forward_nodes.steps(board,forward_nodes.ids[meet])+backward_nodes.steps_to_root(board,backward_nodes.ids[meet])
+
+class Node():
+    """
+    A node of the path found, kept for printing it out: the searches store their nodes in a NodeStore,
+    the Node objects are only created for the path.
+    """
+    __slots__ = ('state','parent','action','step_cost','g','f','h')
+
+    def __init__(self,state,parent,action,depth,step_cost,path_cost,heuristic_cost):
+        self.state = state 
+        self.parent = parent # parent node
+        self.action = action # move up, left, down, right      
+        self.step_cost = step_cost #the tile that has been moved, the path
+        self.g = depth # depth of the node in the tree
+        self.f = path_cost # accumulated g(n), the cost to reach the current node
+        self.h = heuristic_cost # h(n), cost to reach goal state from the current node
+        
+    def __repr__(self):
+      return '\n{}, parent={}, heuristic={},f_score={}'.format(self.state,self.parent,self.h,self.f)
+
+    def get_state(self) :
+        return self.state
+    
+    def get_blank_position(self):
+        """
+        Returns the index of the blank space.
+        """
+        return tuple([index[0] for index in np.where(self.state == 0)])
+    
+    def is_valid_move(self,state, move):
+        """Returns a boolean telling if the move is valid or not.
+        UP, DOWN -> x dependant
+        LEFT,RIGHT -> y dependant.  
+        """
+        blankx, blanky = self.get_blank_position()
+        return (move == UP and blankx != state.shape[0] - 1 ) or \
+                 (move == DOWN and blankx != 0) or \
+                 (move == LEFT and blanky != state.shape[1] - 1) or \
+                 (move == RIGHT and blanky != 0)   
+     
+    def is_in_grid(self,x,y):
+        """Checks if the given tuple (x,y) is in the grid."""
+        if x < 0 or y < 0 or x >= self.state.shape[0] or y >= self.state.shape[1]:
+            return False
+        return True            
+    #Each action will lead to a new state
+    def try_move_up(self):
+      """Moving the blank tile up."""
+      blankx, blanky = self.get_blank_position()
+
+      # print('---------- #UP ⬆️  -----------')
+      if not self.is_valid_move(self.state,UP):
+        # print('Not a valid move')
+        return False
+      else:
+        new_state = self.state.copy()
+        lower_value = self.state[blankx + 1,blanky]    
+        new_state[blankx,blanky] = lower_value
+        new_state[blankx + 1,blanky] = 0
+        return new_state,lower_value
+
+    def try_move_down(self):
+      """Moving the blank tile down."""
+      blankx, blanky = self.get_blank_position()
+      # print('---------- #DOWN ⬇️  -----------') 
+      if not self.is_valid_move(self.state,DOWN):
+        return False
+      else:
+        new_state= self.state.copy()  
+        upper_value = self.state[blankx - 1,blanky]
+        new_state[blankx,blanky] = upper_value
+        new_state[blankx - 1,blanky] = 0  
+
+        return new_state,upper_value
+
+    def try_move_left(self):
+      """Moving the blank tile left."""
+      blankx, blanky = self.get_blank_position()
+
+      # print('---------- #LEFT ⬅️  -----------')
+      if not self.is_valid_move(self.state,LEFT):
+        return False
+      else:
+        new_state= self.state.copy()
+        right_value = self.state[blankx,blanky + 1]
+        new_state[blankx,blanky] = right_value
+        new_state[blankx,blanky + 1] = 0
+        return new_state,right_value
+
+    def try_move_right(self):
+      blankx, blanky = self.get_blank_position()
+      new_state= self.state.copy()   
+      # print('---------- #RIGHT ➡️  -----------')
+      if not self.is_valid_move(self.state,RIGHT):
+        # print('Not a valid move')
+        return False
+      else:
+        left_value = self.state[blankx,blanky - 1]
+        new_state[blankx,blanky] = left_value
+        new_state[blankx,blanky - 1] = 0
+        return new_state,left_value
+    
+    # return user specified heuristic cost
+    def get_h_cost(self,new_state,goal_state,heuristic_function):
+        board = get_board(*np.shape(new_state))
+        return get_heuristic(board,board.encode(goal_state),heuristic_function)(board.encode(new_state))
+    
+    # return heuristic cost: number of misplaced tiles
+    def h_misplaced_cost(self,new_state,goal_state):
+        return self.get_h_cost(new_state,goal_state,'num_misplaced')
+    
+    # return heuristic cost: sum of Manhattan distance to reach the goal state
+    def h_manhattan_cost(self,new_state,goal_state):
+        return self.get_h_cost(new_state,goal_state,'manhattan')
+
+    def get_tile_position(self,value):
+        """Returns the position (x,y) for the given value of the tile."""
+        return tuple([index[0] for index in np.where(self.state == value)])
+      
+    def get_neighbors_around_blank(self) -> list: 
+        """Returns the neighbors of the blank tile."""
+        bx,by = self.get_blank_position()
+        around_blank_tiles = [(bx-1,by),(bx,by+1),(bx,by-1),(bx+1,by)]
+        return [tile for tile in around_blank_tiles if self.is_in_grid(tile[0],tile[1])]      
+    
+    
+    # once the goal node is found, trace back to the root node and print out the path   
+    def print_path(self):
+        # create FILO stacks to place the trace
+        full_path = []
+        state_trace = [self.state]
+        action_trace = [self.action]
+        depth_trace = [self.g]
+        step_cost_trace = [self.step_cost]
+        path_cost_trace = [self.f]
+        heuristic_cost_trace = [self.h]
+        
+        # add node information as tracing back up the tree
+        while self.parent:
+            state_trace.append(self.state)
+            action_trace.append(self.action)
+            depth_trace.append(self.g)
+            step_cost_trace.append(self.get_tile_position(self.step_cost)) #the tile that has moved
+            path_cost_trace.append(self.f)
+            heuristic_cost_trace.append(self.h)
+            if self.action is not None:
+                full_path.append((self.step_cost,self.action))
+            self = self.parent
+        # print out the path
+        step_counter = 0
+        while state_trace:
+            depth = depth_trace.pop()
+            h = heuristic_cost_trace.pop()
+            print('step ',step_counter)
+            print(state_trace.pop())
+            print("""action= {}, 
+                  depth= {},
+                  moved tile= {},
+                  h = {},
+                  f_score= {}""".format(action_trace.pop(),
+                                        str(depth),
+                                        str(step_cost_trace.pop()),
+                                        str(h),
+                                        str(depth+h)
+                                        )
+                )
+            step_counter += 1
+        
+        
+        return full_path[::-1]
+                
+                        
+    def grow_path(self,steps,heuristic):
+        """
+        Creates the nodes of a path starting from this node, each linked to its parent only.
+        steps is a list of (packed state, moved tile, action), heuristic gives h(n) for a packed state.
+        Returns the last node of the path.
+        """
+        node = self
+        for code,tile,action in steps:
+            node = Node(state=decode_state(code,self.state.shape),parent=node,action=action,depth=node.g+1,
+                        step_cost=tile,path_cost=node.f+tile,heuristic_cost=heuristic(code))
+        return node
+
+    def search_result(self,steps,heuristic,stats,quiet) -> SearchResult:
+        """
+        Returns the path given by the steps of a search, with its stats.
+        Unless quiet, the nodes of the path are created to print it out with the stats.
+        """
+        start = time.perf_counter()
+        if quiet:
+            path = [(tile,action) for _,tile,action in steps]
+        else:
+            path = self.grow_path(steps,heuristic).print_path()
+        stats.path_time = time.perf_counter()-start
+        if not quiet:
+            print(stats.report())
+        return SearchResult(path,stats)
+
+    # search based on path cost + heuristic cost
+    def a_star_search(self,goal_state,heuristic_function,time_limit=None,quiet=False,on_expand=None) -> SearchResult:
+        """
+        The implementation of A* Algorithm involves maintaining two lists- OPEN and CLOSED.
+        OPEN contains those states that have been evaluated by the heuristic function but have not been expanded into successors yet.
+        OPEN is a Frontier, a binary heap ordered on f(n) = g(n) + h(n), see Frontier for the tie-breaking rules.
+        The entries only hold f(n), h(n) and the packed state, the depth g(n) is read from the NodeStore.
+
+        CLOSED contains those states that have already been visited, to avoid repeated state.
+        The reached states are kept in a NodeStore, with their parent id and a flag for CLOSED.
+        The measures of the search are returned with the path in a SearchStats.
+
+        The search runs on packed states (see encode_state), which are also the keys of OPEN and CLOSED,
+        and the children are generated from the neighbor table of the blank index (see Board).
+        The heuristic is precomputed for goal_state (see HeuristicTable) and updated incrementally from parent to child.
+        Nodes are only created for the optimal path: when the goal state is found,
+        trace back to the root node and print out the path, unless quiet.
+        on_expand(state, depth, h) is called for every expanded state, if given, to trace or sample the search.
+        With time_limit, BudgetExceededError is raised when the search is not done after time_limit seconds.
+        Raises UnsolvablePuzzleError when the goal state cannot be reached, before searching.
+        """
+        stats = SearchStats()
+        start = time.perf_counter()
+        deadline = None if time_limit is None else start+time_limit
+        check_solvable(self.state,goal_state)
+        
+        board = get_board(*self.state.shape)
+        goal_code = board.encode(goal_state)
+        start_code = board.encode(self.state)
+        heuristic = get_heuristic(board,goal_code,heuristic_function)
+        child_cost = heuristic.child_cost
+        neighbors,tile_bits,tile_mask = board.neighbors,board.tile_bits,board.tile_mask
+        
+        nodes = NodeStore() # reached states with their parent, to trace back the path
+        nodes.add(start_code,-1,0,board.blank_index(start_code))
+        ids,parents,depths,blanks,closed = nodes.ids,nodes.parents,nodes.depths,nodes.blanks,nodes.closed # closed[id] records visited states
+        open = Frontier(nodes) # found but unvisited states, ordered by path cost+heuristic cost
+        open.push(0,start_code,depth=0,heuristic_cost=heuristic(start_code))
+        num_nodes_expanded = 0 # number of nodes popped off the open, measuring time performance
+        num_nodes_generated = 0
+        num_duplicates = 0
+        queue_max_length = 1 # max number of nodes in the open, measuring space performance
+        stats.setup_time = time.perf_counter()-start
+        
+        while open:
+            # update maximum length of the queue
+            if len(open) > queue_max_length:
+                queue_max_length = len(open)
+                
+            # select and remove the state with the lowest path cost+heuristic cost
+            _, h_cost, _, current = open.pop()
+            
+            num_nodes_expanded += 1 
+            if deadline is not None and not num_nodes_expanded % DEADLINE_CHECK:
+                check_deadline(deadline,num_nodes_expanded)
+            current_id = ids[current]
+            current_depth,blank = depths[current_id],blanks[current_id]
+            closed[current_id] = 1 # avoid repeated state
+            if on_expand is not None:
+                on_expand(current,current_depth,h_cost)
+            
+            # when the goal state is found, trace back to the root node and print out the path
+            if current == goal_code:
+                stats.expansions,stats.generations,stats.duplicates = num_nodes_expanded,num_nodes_generated,num_duplicates
+                stats.peak_open,stats.peak_closed,stats.iterations = queue_max_length,num_nodes_expanded,1
+                stats.search_time = time.perf_counter()-start-stats.setup_time
+                return self.search_result(nodes.steps(board,current_id),heuristic,stats,quiet)
+            
+            #We compute children 
+            # moving upper tile down, left tile to the right, lower tile up and right tile to the left
+            blank_shift = blank*tile_bits
+            depth = current_depth+1
+            moves = neighbors[blank]
+            num_nodes_generated += len(moves)
+            for index,shift,action in moves:
+                tile = (current >> shift) & tile_mask
+                child = current ^ (tile << shift) ^ (tile << blank_shift)
+                # check if the resulting state is already visited, or in OPEN with a lower or equal depth
+                child_id = ids.get(child)
+                if child_id is None:
+                    child_id = nodes.add(child,current_id,depth,index)
+                elif closed[child_id] or depths[child_id] <= depth:
+                    num_duplicates += 1
+                    continue
+                else:
+                    parents[child_id],depths[child_id] = current_id,depth
+                # only the moved tile changes its cell, from index to blank
+                open.push(child_id,child,depth=depth,heuristic_cost=child_cost(h_cost,child,tile,index,blank))
+
+    # depth first search bounded on path cost + heuristic cost, iterative deepening on the bound
+    def ida_star_search(self,goal_state,heuristic_function,table_size=TRANSPOSITION_TABLE_SIZE,time_limit=None,quiet=False,on_expand=None) -> SearchResult:
+        """
+        The implementation of IDA* runs depth first searches that cut the nodes with f(n) = g(n) + h(n) above a bound.
+        The first bound is h(root), then it is raised to the lowest f(n) that has been cut, until the goal state is found.
+        As the bound only grows by the smallest step, the first solution found is optimal.
+
+        Only the current path is kept in memory, O(depth), plus a transposition table of at most table_size states:
+        it records the lowest depth a state was reached with during the iteration, reaching it again as deep or deeper is cut.
+        The moves that undo the previous one are not tried.
+        When the goal state is found, print out the path like a_star_search, unless quiet.
+        on_expand(state, depth, h) is called for every expanded state, if given.
+        With time_limit, BudgetExceededError is raised when the search is not done after time_limit seconds.
+        Raises UnsolvablePuzzleError when the goal state cannot be reached, before searching.
+        """
+        stats = SearchStats()
+        start = time.perf_counter()
+        deadline = None if time_limit is None else start+time_limit
+        check_solvable(self.state,goal_state)
+        
+        board = get_board(*self.state.shape)
+        goal_code = board.encode(goal_state)
+        start_code = board.encode(self.state)
+        heuristic = get_heuristic(board,goal_code,heuristic_function)
+        child_cost = heuristic.child_cost
+        neighbors,tile_bits,tile_mask = board.neighbors,board.tile_bits,board.tile_mask
+        
+        path = [] # (state, moved tile, action) from the root to the current node
+        num_nodes_expanded = 0 # measuring time performance
+        num_nodes_generated = 0
+        num_duplicates = 0
+        deepest = 0 # longest path, measuring space performance
+        
+        def search(current,blank,depth,h_cost,previous,bound,table):
+            """Returns FOUND, or the lowest f(n) above the bound among the cut nodes."""
+            nonlocal num_nodes_expanded,num_nodes_generated,num_duplicates,deepest
+            f_score = depth+h_cost
+            if f_score > bound:
+                return f_score
+            if current == goal_code:
+                return FOUND
+            seen = table.get(current)
+            if seen is not None and seen <= depth:
+                num_duplicates += 1
+                return math.inf
+            if seen is not None or len(table) < table_size:
+                table[current] = depth
+            num_nodes_expanded += 1
+            if deadline is not None and not num_nodes_expanded % DEADLINE_CHECK:
+                check_deadline(deadline,num_nodes_expanded)
+            if depth > deepest:
+                deepest = depth
+            if on_expand is not None:
+                on_expand(current,depth,h_cost)
+            lowest = math.inf
+            blank_shift = blank*tile_bits
+            for index,shift,action in neighbors[blank]:
+                if index == previous:
+                    continue
+                num_nodes_generated += 1
+                tile = (current >> shift) & tile_mask
+                child = current ^ (tile << shift) ^ (tile << blank_shift)
+                path.append((child,tile,action))
+                result = search(child,index,depth+1,child_cost(h_cost,child,tile,index,blank),blank,bound,table)
+                if result is FOUND:
+                    return FOUND
+                path.pop()
+                if result < lowest:
+                    lowest = result
+            return lowest
+        
+        root_h_cost = bound = heuristic(start_code)
+        stats.setup_time = time.perf_counter()-start
+        while True:
+            table = {}
+            result = search(start_code,board.blank_index(start_code),0,root_h_cost,None,bound,table)
+            stats.iterations += 1
+            stats.peak_closed = max(stats.peak_closed,len(table))
+            if result is FOUND:
+                stats.expansions,stats.generations,stats.duplicates = num_nodes_expanded,num_nodes_generated,num_duplicates
+                stats.peak_open = deepest+1
+                stats.search_time = time.perf_counter()-start-stats.setup_time
+                return self.search_result(path,heuristic,stats,quiet)
+            if result == math.inf:
+                return None # no node was cut, the goal state cannot be reached
+            bound = result
+
+    # no search, the best move of every state is read from the lookup table of the board
+    def lookup_search(self,goal_state,heuristic_function=None,time_limit=None,quiet=False,on_expand=None) -> SearchResult:
+        """
+        Walks the lookup table from the initial state to goal_state: one lookup per move, 31 at most on the 3x3 board.
+        The table of the whole state space is built by a BFS and saved the first time (see LookupSolver),
+        only boards up to 10 cells have one. It also gives the exact distances, heuristic_function is ignored,
+        and time_limit too: the walk is a few lookups.
+        The path is printed out like a_star_search, unless quiet, on_expand(state, depth, h) is called for every state of the path.
+        Raises UnsolvablePuzzleError when the goal state cannot be reached.
+        """
+        stats = SearchStats()
+        start = time.perf_counter()
+        check_solvable(self.state,goal_state)
+        
+        board = get_board(*self.state.shape)
+        solver = get_lookup_solver(board,board.encode(goal_state))
+        start_code = board.encode(self.state)
+        stats.setup_time = time.perf_counter()-start
+        
+        steps = solver.walk(start_code)
+        if on_expand is not None:
+            on_expand(start_code,0,len(steps))
+            for depth,(code,_,_) in enumerate(steps,1):
+                on_expand(code,depth,len(steps)-depth)
+        stats.expansions = len(steps)+1 # one lookup per state of the path
+        stats.iterations = 1
+        stats.search_time = time.perf_counter()-start-stats.setup_time
+        return self.search_result(steps,solver,stats,quiet)
+
+    # breadth first search from both ends, meeting in the middle
+    def bidirectional_bfs_search(self,goal_state,heuristic_function=None,time_limit=None,quiet=False,on_expand=None) -> SearchResult:
+        """
+        Breadth first searches from the initial state and from goal_state, one level at a time,
+        always expanding the smaller level. The first state reached by both searches is on an optimal path:
+        no state of the levels already expanded had been reached by the other search.
+        Each search goes about half the depth, so it stores about the square root of the states of a BFS.
+        The heuristic only gives h(n) when the path is printed out, unless quiet.
+        on_expand(state, depth, h) is called for every expanded state with h = 0, the depth counting from its end.
+        With time_limit, BudgetExceededError is raised when the search is not done after time_limit seconds.
+        Raises UnsolvablePuzzleError when the goal state cannot be reached, before searching.
+        """
+        stats = SearchStats()
+        start = time.perf_counter()
+        deadline = None if time_limit is None else start+time_limit
+        check_solvable(self.state,goal_state)
+        
+        board = get_board(*self.state.shape)
+        goal_code = board.encode(goal_state)
+        start_code = board.encode(self.state)
+        neighbors,tile_bits,tile_mask = board.neighbors,board.tile_bits,board.tile_mask
+        
+        nodes = (NodeStore(),NodeStore()) # forward and backward search
+        nodes[0].add(start_code,-1,0,board.blank_index(start_code))
+        nodes[1].add(goal_code,-1,0,board.blank_index(goal_code))
+        levels = ([(start_code,board.blank_index(start_code))],[(goal_code,board.blank_index(goal_code))])
+        depths = [0,0]
+        num_nodes_expanded = num_nodes_generated = num_duplicates = 0
+        largest_levels = 2 # max number of states in the two levels, measuring space performance
+        meet = start_code if start_code == goal_code else None
+        stats.setup_time = time.perf_counter()-start
+        
+        while meet is None and levels[0] and levels[1]:
+            side = 0 if len(levels[0]) <= len(levels[1]) else 1
+            store,visited,other_visited = nodes[side],nodes[side].ids,nodes[1-side].ids
+            next_level = []
+            for current,blank in levels[side]:
+                num_nodes_expanded += 1
+                if deadline is not None and not num_nodes_expanded % DEADLINE_CHECK:
+                    check_deadline(deadline,num_nodes_expanded)
+                if on_expand is not None:
+                    on_expand(current,depths[side],0)
+                blank_shift = blank*tile_bits
+                current_id = visited[current]
+                for index,shift,action in neighbors[blank]:
+                    num_nodes_generated += 1
+                    tile = (current >> shift) & tile_mask
+                    child = current ^ (tile << shift) ^ (tile << blank_shift)
+                    if child in visited:
+                        num_duplicates += 1
+                        continue
+                    store.add(child,current_id,depths[side]+1,index)
+                    next_level.append((child,index))
+                    if child in other_visited:
+                        meet = child
+                        break
+                if meet is not None:
+                    break
+            levels[side][:] = next_level
+            depths[side] += 1
+            largest_levels = max(largest_levels,len(levels[0])+len(levels[1]))
+        if meet is None:
+            return None # a search ran out of states, the goal state cannot be reached
+        
+        stats.expansions,stats.generations,stats.duplicates = num_nodes_expanded,num_nodes_generated,num_duplicates
+        stats.peak_open,stats.peak_closed,stats.iterations = largest_levels,len(nodes[0])+len(nodes[1]),1
+        stats.search_time = time.perf_counter()-start-stats.setup_time
+        heuristic = None if quiet else get_heuristic(board,goal_code,heuristic_function or 'manhattan')
+        return self.search_result(join_steps(board,nodes[0],nodes[1],meet),heuristic,stats,quiet)
+
+    # front-to-end bidirectional heuristic search, meeting in the middle (MM)
+    def mm_search(self,goal_state,heuristic_function,time_limit=None,quiet=False,on_expand=None) -> SearchResult:
+        """
+        The implementation of MM (Holte et al. 2016) runs an A* like search from each end, the forward search
+        with h(n) to goal_state and the backward search with h(n) to the initial state, both in a Frontier.
+        A state is prioritized on max(g(n) + h(n), 2 g(n)), so neither search goes beyond the middle of an optimal path,
+        and the side with the lowest priority is expanded. When a child has been reached by the other search,
+        the path through it is a candidate; the search stops when no priority is below the best candidate.
+        Stores the lowest g(n) of every state in each direction: a state reached with a lower g(n) is opened again.
+        The backward heuristic is built for the initial state, with pattern_database this may build new tables.
+        The path is printed out like a_star_search unless quiet, on_expand(state, depth, h) is called for every
+        expanded state of both searches.
+        With time_limit, BudgetExceededError is raised when the search is not done after time_limit seconds.
+        Raises UnsolvablePuzzleError when the goal state cannot be reached, before searching.
+        """
+        stats = SearchStats()
+        start = time.perf_counter()
+        deadline = None if time_limit is None else start+time_limit
+        check_solvable(self.state,goal_state)
+        
+        board = get_board(*self.state.shape)
+        goal_code = board.encode(goal_state)
+        start_code = board.encode(self.state)
+        heuristics = (get_heuristic(board,goal_code,heuristic_function),
+                      get_heuristic(board,start_code,reverse_heuristic(board,goal_code,start_code,heuristic_function)))
+        neighbors,tile_bits,tile_mask = board.neighbors,board.tile_bits,board.tile_mask
+        
+        nodes = (NodeStore(),NodeStore()) # states reached by each search, with their lowest g(n)
+        opens = (Frontier(nodes[0]),Frontier(nodes[1])) # forward and backward OPEN, prioritized on max(g(n) + h(n), 2 g(n))
+        for side,code in enumerate((start_code,goal_code)):
+            nodes[side].add(code,-1,0,board.blank_index(code))
+            opens[side].push(0,code,depth=0,heuristic_cost=heuristics[side](code))
+        num_nodes_expanded = num_nodes_generated = num_duplicates = 0
+        queue_max_length = 2
+        best_cost,meet = (0,start_code) if start_code == goal_code else (math.inf,None)
+        stats.setup_time = time.perf_counter()-start
+        
+        while opens[0] and opens[1]:
+            queue_max_length = max(queue_max_length,len(opens[0])+len(opens[1]))
+            priorities = (opens[0].peek()[0],opens[1].peek()[0])
+            if best_cost <= min(priorities):
+                break # no path through an open state can be shorter
+            side = 0 if priorities[0] <= priorities[1] else 1
+            open,store,other = opens[side],nodes[side],nodes[1-side]
+            ids,parents,depths,other_ids,other_depths = store.ids,store.parents,store.depths,other.ids,other.depths
+            child_cost = heuristics[side].child_cost
+            _, h_cost, _, current = open.pop()
+            current_id = ids[current]
+            current_depth,blank = depths[current_id],store.blanks[current_id]
+            num_nodes_expanded += 1
+            if deadline is not None and not num_nodes_expanded % DEADLINE_CHECK:
+                check_deadline(deadline,num_nodes_expanded)
+            if on_expand is not None:
+                on_expand(current,current_depth,h_cost)
+            
+            blank_shift = blank*tile_bits
+            depth = current_depth+1
+            moves = neighbors[blank]
+            num_nodes_generated += len(moves)
+            for index,shift,action in moves:
+                tile = (current >> shift) & tile_mask
+                child = current ^ (tile << shift) ^ (tile << blank_shift)
+                child_id = ids.get(child)
+                if child_id is None:
+                    child_id = store.add(child,current_id,depth,index)
+                elif depths[child_id] <= depth:
+                    num_duplicates += 1
+                    continue
+                else:
+                    parents[child_id],depths[child_id] = current_id,depth
+                child_h_cost = child_cost(h_cost,child,tile,index,blank)
+                open.push(child_id,child,depth=depth,heuristic_cost=child_h_cost,f_score=max(depth+child_h_cost,2*depth))
+                other_id = other_ids.get(child)
+                if other_id is not None and depth+other_depths[other_id] < best_cost:
+                    best_cost,meet = depth+other_depths[other_id],child
+        if meet is None:
+            return None # a search ran out of states, the goal state cannot be reached
+        
+        stats.expansions,stats.generations,stats.duplicates = num_nodes_expanded,num_nodes_generated,num_duplicates
+        stats.peak_open,stats.peak_closed,stats.iterations = queue_max_length,len(nodes[0])+len(nodes[1]),1
+        stats.search_time = time.perf_counter()-start-stats.setup_time
+        return self.search_result(join_steps(board,nodes[0],nodes[1],meet),heuristics[0],stats,quiet)
+
+    # best-first searches trading path length for time, see bounded_search
+    def weighted_a_star_search(self,goal_state,heuristic_function,weight=WEIGHT,**options) -> SearchResult:
+        """Weighted A*: f(n) = g(n) + weight*h(n), the path is at most weight times longer than the optimal one."""
+        return self.bounded_search(goal_state,heuristic_function,weights=(weight,),**options)
+
+    def ara_star_search(self,goal_state,heuristic_function,weights=ARA_WEIGHTS,**options) -> SearchResult:
+        """Anytime Repairing A*: weighted A* searches with decreasing weights, each improving the last path."""
+        return self.bounded_search(goal_state,heuristic_function,weights=weights,**options)
+
+    def greedy_search(self,goal_state,heuristic_function,**options) -> SearchResult:
+        """Greedy best-first search: f(n) = h(n), the fastest path found, with no bound but the one measured."""
+        return self.bounded_search(goal_state,heuristic_function,weights=(1,),greedy=True,**options)
+
+    def bounded_search(self,goal_state,heuristic_function,weights,greedy=False,time_limit=None,max_expansions=None,
+                       quiet=False,on_expand=None,on_solution=None) -> SearchResult:
+        """
+        The implementation of ARA* (Likhachev et al. 2003) runs a weighted A* with f(n) = g(n) + w*h(n)
+        (f(n) = h(n) when greedy) for every weight w of weights, reusing the search effort of the previous weights.
+        A state reached again with a lower g(n) is put back in OPEN, or in INCONS when it was already expanded
+        with this weight; INCONS is merged into OPEN for the next weight. A search stops when no f(n) in OPEN
+        is below the length of the best path.
+
+        Every path found is at most min(w, length / min(g(n) + h(n) over OPEN and INCONS, h(root))) times longer
+        than the optimal path (w only once the search with this weight is complete): the bound is in stats.suboptimality.
+        on_solution(path) is called with every improved path, a SearchResult, if given.
+        The search stops when time_limit seconds or max_expansions expansions are spent: the best path found so far
+        is returned with stats.exhausted, BudgetExceededError is raised if there is none.
+        The path is printed out like a_star_search unless quiet, on_expand(state, depth, h) is called for every expanded state.
+        Raises UnsolvablePuzzleError when the goal state cannot be reached, before searching.
+        """
+        stats = SearchStats()
+        start = time.perf_counter()
+        deadline = None if time_limit is None else start+time_limit
+        check_solvable(self.state,goal_state)
+        
+        board = get_board(*self.state.shape)
+        goal_code = board.encode(goal_state)
+        start_code = board.encode(self.state)
+        heuristic = get_heuristic(board,goal_code,heuristic_function)
+        child_cost = heuristic.child_cost
+        neighbors,tile_bits,tile_mask = board.neighbors,board.tile_bits,board.tile_mask
+        
+        root_h_cost = heuristic(start_code)
+        nodes = NodeStore() # reached states with their lowest g(n), closed[id] records the states expanded with this weight
+        nodes.add(start_code,-1,0,board.blank_index(start_code))
+        ids,parents,depths,blanks = nodes.ids,nodes.parents,nodes.depths,nodes.blanks
+        incons = {start_code:root_h_cost} # states to put in OPEN, with their h
+        num_nodes_expanded = num_nodes_generated = num_duplicates = 0
+        queue_max_length = 1
+        best_path = None
+        suboptimality = math.inf
+        stats.setup_time = time.perf_counter()-start
+        
+        for weight in weights:
+            # OPEN is rebuilt with the new weight from the states of OPEN and INCONS
+            open = Frontier(nodes,depth_weight=0 if greedy else 1,heuristic_weight=weight)
+            for code,h_cost in incons.items():
+                node = ids[code]
+                open.push(node,code,depth=depths[node],heuristic_cost=h_cost)
+            incons = {}
+            closed = nodes.closed = bytearray(len(nodes))
+            stats.iterations += 1
+            goal_f_score = math.inf if goal_code not in ids else 0 if greedy else depths[ids[goal_code]]
+            
+            while open and open.peek()[0] < goal_f_score:
+                if (max_expansions is not None and num_nodes_expanded >= max_expansions) or \
+                   (deadline is not None and time.perf_counter() >= deadline):
+                    stats.exhausted = True
+                    break
+                if len(open) > queue_max_length:
+                    queue_max_length = len(open)
+                _, h_cost, _, current = open.pop()
+                num_nodes_expanded += 1
+                current_id = ids[current]
+                current_depth,blank = depths[current_id],blanks[current_id]
+                closed[current_id] = 1
+                if on_expand is not None:
+                    on_expand(current,current_depth,h_cost)
+                
+                blank_shift = blank*tile_bits
+                depth = current_depth+1
+                moves = neighbors[blank]
+                num_nodes_generated += len(moves)
+                for index,shift,action in moves:
+                    tile = (current >> shift) & tile_mask
+                    child = current ^ (tile << shift) ^ (tile << blank_shift)
+                    child_id = ids.get(child)
+                    if child_id is None:
+                        child_id = nodes.add(child,current_id,depth,index)
+                    elif depths[child_id] <= depth:
+                        num_duplicates += 1
+                        continue
+                    else:
+                        parents[child_id],depths[child_id] = current_id,depth
+                    child_h_cost = child_cost(h_cost,child,tile,index,blank)
+                    if child == goal_code:
+                        goal_f_score = 0 if greedy else depth
+                    if closed[child_id]:
+                        incons[child] = child_h_cost
+                    else:
+                        open.push(child_id,child,depth=depth,heuristic_cost=child_h_cost)
+            
+            goal_id = ids.get(goal_code)
+            goal_depth = None if goal_id is None else depths[goal_id]
+            if goal_depth is None:
+                if stats.exhausted:
+                    break
+                return None # OPEN ran out of states, the goal state cannot be reached
+            improved = best_path is None or goal_depth < len(best_path)
+            if improved:
+                best_path = nodes.steps(board,goal_id)
+            # a state of an optimal path reached with its optimal g(n) and not expanded since is in OPEN or INCONS,
+            # unless the path found is optimal: the lowest g(n) + h(n) there is a lower bound of the optimal length
+            lower_bound = min([depths[ids[code]]+h for _,h,_,code in open.live_entries()]+
+                              [depths[ids[code]]+h for code,h in incons.items()]+[goal_depth])
+            bound = max(1.0,goal_depth/max(lower_bound,root_h_cost,1))
+            if not (greedy or stats.exhausted):
+                bound = min(bound,weight) # a complete weighted A* with a consistent heuristic
+            suboptimality = min(suboptimality,bound)
+            if improved and on_solution is not None:
+                solution_stats = SearchStats()
+                solution_stats.suboptimality = suboptimality
+                on_solution(SearchResult([(tile,action) for _,tile,action in best_path],solution_stats))
+            if stats.exhausted or suboptimality == 1:
+                break
+            for _,h_cost,_,code in open.live_entries():
+                incons[code] = h_cost
+        
+        if best_path is None:
+            raise BudgetExceededError('the budget ran out after {} expansions, before any path was found'.format(num_nodes_expanded))
+        stats.suboptimality = suboptimality
+        stats.expansions,stats.generations,stats.duplicates = num_nodes_expanded,num_nodes_generated,num_duplicates
+        stats.peak_open,stats.peak_closed = queue_max_length,len(nodes)
+        stats.search_time = time.perf_counter()-start-stats.setup_time
+        return self.search_result(best_path,heuristic,stats,quiet)
+
+    # breadth first search expanding a whole level at once with NumPy, optionally a beam search
+    def vector_bfs_search(self,goal_state,heuristic_function,beam_width=None,time_limit=None,quiet=False,on_expand=None) -> SearchResult:
+        """
+        Level-synchronous breadth first search: the level is an array of nodes (see VectorNodes), all its children
+        are generated, scored and deduplicated with NumPy operations, without a Python loop over the states.
+        With a beam_width, only the beam_width children of lowest h(n) are kept in every level: the path is found
+        in memory linear in the depth but is not always optimal, its bound measured against h(root) is in
+        stats.suboptimality, and None is returned when the beam loses every path. Without it the path is optimal.
+        Only the num_misplaced and manhattan heuristics and the boards up to 4x4 are supported.
+        The path is printed out like a_star_search unless quiet, on_expand(state, depth, h) is called for every expanded state.
+        With time_limit, BudgetExceededError is raised when the search is not done after time_limit seconds,
+        the time being checked once per level.
+        Raises UnsolvablePuzzleError when the goal state cannot be reached, before searching.
+        """
+        stats = SearchStats()
+        start = time.perf_counter()
+        deadline = None if time_limit is None else start+time_limit
+        check_solvable(self.state,goal_state)
+        
+        board = get_board(*self.state.shape)
+        goal_code = board.encode(goal_state)
+        start_code = board.encode(self.state)
+        vector = get_vector_board(board)
+        heuristic = get_vector_heuristic(board,goal_code,heuristic_function)
+        
+        nodes = VectorNodes()
+        root = np.array([start_code],dtype=np.uint64)
+        root_h_cost = heuristic(vector.unpack(root))
+        level = nodes.add(root,-1,0,root_h_cost,0,0) # node ids of the level
+        root_h_cost = int(root_h_cost[0])
+        goal_id = 0 if start_code == goal_code else None
+        num_nodes_expanded = num_nodes_generated = num_duplicates = 0
+        largest_level = 1
+        depth = 0
+        pruned = False
+        stats.setup_time = time.perf_counter()-start
+        
+        while goal_id is None and len(level):
+            if deadline is not None:
+                check_deadline(deadline,num_nodes_expanded)
+            num_nodes_expanded += len(level)
+            if on_expand is not None:
+                for code,h_cost in zip(nodes.codes[level],nodes.h[level]):
+                    on_expand(int(code),depth,int(h_cost))
+            tiles = vector.unpack(nodes.codes[level])
+            blanks = np.argmin(tiles,axis=1)
+            children,child_blanks,rows,moved,moves = vector.expand(tiles,blanks)
+            depth += 1
+            num_nodes_generated += len(rows)
+            codes = vector.pack(children)
+            # one child per state, only the states not reached yet
+            _,keep = np.unique(codes,return_index=True)
+            keep = keep[nodes.find(codes[keep]) < 0]
+            num_duplicates += len(rows)-len(keep)
+            h_costs = heuristic.child_cost(nodes.h[level][rows[keep]],moved[keep],child_blanks[keep],blanks[rows[keep]])
+            if beam_width is not None and len(keep) > beam_width:
+                best = np.argpartition(h_costs,beam_width-1)[:beam_width]
+                keep,h_costs = keep[best],h_costs[best]
+                pruned = True
+            level = nodes.add(codes[keep],level[rows[keep]],depth,h_costs,moved[keep],moves[keep])
+            largest_level = max(largest_level,len(level))
+            found = np.flatnonzero(codes[keep] == goal_code)
+            if len(found):
+                goal_id = level[found[0]]
+        if goal_id is None:
+            return None # the level ran out of states, the beam dropped every path to the goal state
+        
+        steps = nodes.steps(goal_id)
+        if pruned:
+            stats.suboptimality = max(1.0,len(steps)/max(root_h_cost,1))
+        stats.expansions,stats.generations,stats.duplicates = num_nodes_expanded,num_nodes_generated,num_duplicates
+        stats.peak_open,stats.peak_closed,stats.iterations = largest_level,len(nodes),1
+        stats.search_time = time.perf_counter()-start-stats.setup_time
+        return self.search_result(steps,get_heuristic(board,goal_code,heuristic_function),stats,quiet)
+
+    # A* expanding a block of the best states at once with NumPy
+    def vector_a_star_search(self,goal_state,heuristic_function,block_size=BLOCK_SIZE,time_limit=None,quiet=False,on_expand=None) -> SearchResult:
+        """
+        Batched A*: the block_size states of lowest f(n) = g(n) + h(n) are taken from OPEN together
+        (ties broken on the lowest h(n)) and expanded with NumPy operations like vector_bfs_search.
+        OPEN is a VectorFrontier, an entry whose f(n) is no longer the one of its node is stale and skipped.
+        A state reached again with a lower g(n) is updated in place and put back in OPEN, since a block may expand
+        a state before its best path is known. The search goes on after the goal state is reached until no f(n)
+        in OPEN is below the length of its path, so the path is optimal, for the cost of expanding a few more states than A*.
+        Only the num_misplaced and manhattan heuristics and the boards up to 4x4 are supported.
+        The path is printed out like a_star_search unless quiet, on_expand(state, depth, h) is called for every expanded state.
+        With time_limit, BudgetExceededError is raised when the search is not done after time_limit seconds,
+        the time being checked once per block.
+        Raises UnsolvablePuzzleError when the goal state cannot be reached, before searching.
+        """
+        stats = SearchStats()
+        start = time.perf_counter()
+        deadline = None if time_limit is None else start+time_limit
+        check_solvable(self.state,goal_state)
+        
+        board = get_board(*self.state.shape)
+        goal_code = board.encode(goal_state)
+        start_code = board.encode(self.state)
+        vector = get_vector_board(board)
+        heuristic = get_vector_heuristic(board,goal_code,heuristic_function)
+        
+        nodes = VectorNodes()
+        root = np.array([start_code],dtype=np.uint64)
+        root_h_cost = heuristic(vector.unpack(root))
+        open = VectorFrontier()
+        open.push(nodes.add(root,-1,0,root_h_cost,0,0),root_h_cost,root_h_cost)
+        goal_id,best_cost = (0,0) if start_code == goal_code else (None,math.inf)
+        num_nodes_expanded = num_nodes_generated = num_duplicates = 0
+        queue_max_length = 1
+        stats.setup_time = time.perf_counter()-start
+        
+        while True:
+            if deadline is not None:
+                check_deadline(deadline,num_nodes_expanded)
+            queue_max_length = max(queue_max_length,len(open))
+            current,f_scores = open.pop(block_size,best_cost)
+            if not len(current):
+                break # OPEN is empty, or no path through an open state can be shorter
+            current = current[f_scores == nodes.depths[current]+nodes.h[current]]
+            num_nodes_expanded += len(current)
+            if on_expand is not None:
+                for code,depth,h_cost in zip(nodes.codes[current],nodes.depths[current],nodes.h[current]):
+                    on_expand(int(code),int(depth),int(h_cost))
+            
+            tiles = vector.unpack(nodes.codes[current])
+            blanks = np.argmin(tiles,axis=1)
+            children,child_blanks,rows,moved,moves = vector.expand(tiles,blanks)
+            num_nodes_generated += len(rows)
+            codes = vector.pack(children)
+            depths = nodes.depths[current][rows]+1
+            # one child per state, with its lowest depth, then only the states not reached as cheaply
+            keep = unique_children(codes,depths)
+            ids = nodes.find(codes[keep])
+            reached = ids >= 0
+            better = reached.copy()
+            better[reached] = depths[keep][reached] < nodes.depths[ids[reached]]
+            updated,keep_updated = ids[better],keep[better]
+            nodes.parents[updated] = current[rows[keep_updated]]
+            nodes.depths[updated] = depths[keep_updated]
+            nodes.tiles[updated] = moved[keep_updated]
+            nodes.moves[updated] = moves[keep_updated]
+            keep = keep[~reached]
+            h_costs = heuristic.child_cost(nodes.h[current][rows[keep]],moved[keep],child_blanks[keep],blanks[rows[keep]])
+            added = nodes.add(codes[keep],current[rows[keep]],depths[keep],h_costs,moved[keep],moves[keep])
+            pushed = np.concatenate((updated,added))
+            num_duplicates += len(rows)-len(pushed)
+            open.push(pushed,nodes.depths[pushed]+nodes.h[pushed],nodes.h[pushed])
+            found = np.flatnonzero(nodes.codes[pushed] == goal_code)
+            if len(found):
+                goal_id = pushed[found[0]]
+                best_cost = int(nodes.depths[goal_id])
+        if goal_id is None:
+            return None # OPEN ran out of states, the goal state cannot be reached
+        
+        stats.expansions,stats.generations,stats.duplicates = num_nodes_expanded,num_nodes_generated,num_duplicates
+        stats.peak_open,stats.peak_closed,stats.iterations = queue_max_length,len(nodes),1
+        stats.search_time = time.perf_counter()-start-stats.setup_time
+        return self.search_result(nodes.steps(goal_id),get_heuristic(board,goal_code,heuristic_function),stats,quiet)
+
+
+SEARCH_MODES = {'a_star':Node.a_star_search,'ida_star':Node.ida_star_search,'lookup':Node.lookup_search,
+                'bidirectional_bfs':Node.bidirectional_bfs_search,'mm':Node.mm_search,
+                'weighted_a_star':Node.weighted_a_star_search,'ara_star':Node.ara_star_search,'greedy':Node.greedy_search,
+                'vector_bfs':Node.vector_bfs_search,'vector_a_star':Node.vector_a_star_search}
+OPTIMAL_MODES = ('a_star','ida_star','lookup','bidirectional_bfs','mm','vector_a_star') # the modes always returning optimal paths
+
+def solve(initial_state,goal_state,heuristic_function='manhattan',mode=None,quiet=False,on_expand=None,patterns=None,**options) -> SearchResult:
+    """
+    Returns the optimal path from initial_state to goal_state as a list of (tile, action),
+    the measures of the search are in its stats attribute (see SearchStats).
+    The options are passed to the search mode, as the weight, time_limit and max_expansions of the bounded-suboptimal
+    modes weighted_a_star, ara_star and greedy, which trade the length of the path for time (see Node.bounded_search).
+    Every mode takes a time_limit in seconds: the bounded-suboptimal modes return the best path found by then,
+    the other modes raise BudgetExceededError.
+    Nothing is printed when quiet, on_expand(state, depth, h) is called for every expanded state if given.
+    Raises UnsolvablePuzzleError when the goal state cannot be reached.
+    By default A* is used up to the 3x3 board, where it is the fastest,
+    and IDA* on larger boards, where the memory of A* grows beyond reach.
+    The lookup mode reads the path from a table of the whole state space, for boards up to 10 cells.
+    The bidirectional modes search from both ends: bidirectional_bfs without heuristic, for the small boards
+    (its levels grow beyond memory past 40 moves on 4x4), and mm with the heuristic from both ends.
+    The vector modes expand many states at once with NumPy, up to 4x4: vector_bfs a whole level (a beam search
+    with the beam_width option) and vector_a_star a block of block_size states.
+    patterns is a partition of the tiles for the pattern_database heuristic, lists of labels (goal cells of the tiles)
+    like the 6-6-3 partition of the 4x4 board, instead of default_patterns.
+    """
+    if patterns is not None:
+        if heuristic_function != 'pattern_database':
+            raise ValueError('patterns are only used by the pattern_database heuristic, not {}'.format(heuristic_function))
+        heuristic_function = pattern_heuristic(patterns)
+    if mode is None:
+        mode = 'a_star' if np.size(initial_state) <= 9 else 'ida_star'
+    if mode not in SEARCH_MODES:
+        raise ValueError('unknown search mode: {}'.format(mode))
+    root_node = Node(state=np.asarray(initial_state),parent=None,action=None,depth=0,step_cost=0,path_cost=0,heuristic_cost=0)
+    return SEARCH_MODES[mode](root_node,goal_state,heuristic_function,quiet=quiet,on_expand=on_expand,**options)
@@ -0,0 +1,191 @@
+"""
+Local solve service: JSON lines over a Unix socket or a localhost TCP port, solved by a pool of processes.
+python -m puzzle_solver serve --help for the command line.
+"""
+import asyncio
+import concurrent.futures
+import functools
+import json
+import os
+
+from .batch import parse_instance,solve_instance
+
+
+# A request is a line like the lines of the batch files: {"id": ..., "start": ..., "goal": ...}, optionally with
+# "rows", "cols", "heuristic", "mode", "timeout" (seconds) and "options" (passed to the search mode).
+# A response is the line of solve_instance with the id of the request, the responses of a connection are written
+# as soon as they are solved, not in the order of the requests. The status 'timeout' is added for the requests
+# that were not solved in time.
+QUEUE_SIZE = 1024 # max number of requests waiting for a worker
+REQUEST_TIMEOUT = 30.0 # default timeout of a request in seconds
+
+
+def parse_settings(request) -> tuple:
+    """Returns the heuristic, mode, options and timeout of a request, None when not given."""
+    heuristic_function,mode,options,timeout = (request.get(key) for key in ('heuristic','mode','options','timeout'))
+    for key,value in (('heuristic',heuristic_function),('mode',mode)):
+        if value is not None and not isinstance(value,str):
+            raise ValueError('{} must be a string, not {!r}'.format(key,value))
+    if options is not None and not isinstance(options,dict):
+        raise ValueError('options must be an object, not {!r}'.format(options))
+    if timeout is not None:
+        if isinstance(timeout,bool) or not isinstance(timeout,(int,float)) or not timeout > 0:
+            raise ValueError('timeout must be a positive number of seconds, not {!r}'.format(timeout))
+        timeout = float(timeout)
+    return heuristic_function,mode,options,timeout
+
+
+class SolveService():
+    """
+    Serves solve requests with a pool of worker processes.
+    The requests wait in a queue of queue_size requests: when it is full, the connections are not read any more
+    until a worker is free (backpressure). A request not answered within its timeout gets a 'timeout' response,
+    it is dropped if it has not reached a worker yet. Otherwise the time left to its timeout is passed to the search
+    as its time_limit (the lowest of both when the request has one), so a worker does not go on searching for
+    a request nobody waits for. Identical requests in flight are solved once.
+    cache is the SQLite file of a SolutionCache shared by the workers, if given.
+    """
+    def __init__(self,workers=None,queue_size=QUEUE_SIZE,timeout=REQUEST_TIMEOUT,heuristic_function='manhattan',mode=None,cache=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.heuristic_function = heuristic_function
+        self.mode = mode
+        self.cache = cache
+        self.queue = asyncio.Queue(queue_size)
+        self.in_flight = {} # key of a request -> [future of its result, number of requests waiting for it, deadline]
+        self.pool = None
+        self.dispatchers = []
+
+    async def start(self,path=None,host='127.0.0.1',port=0):
+        """Starts the workers and listens on the Unix socket at path, or on host:port. Returns the server."""
+        self.pool = concurrent.futures.ProcessPoolExecutor(self.workers)
+        # the workers are forked before listening: forked later, they would inherit the client sockets open
+        # at that time and keep them open after the server closes them, so the clients would never get EOF
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool,os.getpid) for _ in range(self.workers)))
+        self.dispatchers = [asyncio.create_task(self.dispatch()) for _ in range(self.workers)]
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_connection,path)
+        return await asyncio.start_server(self.handle_connection,host,port)
+
+    def close(self):
+        for dispatcher in self.dispatchers:
+            dispatcher.cancel()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    async def dispatch(self):
+        """Sends the queued requests to the pool, one at a time, so the queue is the only buffer."""
+        loop = asyncio.get_running_loop()
+        while True:
+            waiting,instance,heuristic_function,mode,options = await self.queue.get()
+            future = waiting[0]
+            try:
+                if future.done():
+                    continue # every request waiting for it timed out
+                try:
+                    time_limit = waiting[2]-loop.time()
+                    if options.get('time_limit') is not None:
+                        time_limit = min(time_limit,options['time_limit'])
+                    solver = functools.partial(solve_instance,instance,heuristic_function,mode,self.cache,dict(options,time_limit=time_limit))
+                    result = await loop.run_in_executor(self.pool,solver)
+                except Exception as e:
+                    result = {'id':instance['id'],'status':'error','error':'{}: {}'.format(type(e).__name__,e)}
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self.queue.task_done()
+
+    async def solve(self,instance,heuristic_function=None,mode=None,options=None,timeout=None,queued=None) -> dict:
+        """
+        Solves an instance with the workers, returns the result of solve_instance.
+        Waits for room in the queue, the time spent waiting counts in the timeout.
+        queued is an asyncio.Event set once the request is in the queue or joined an identical request, if given.
+        """
+        heuristic_function = heuristic_function or self.heuristic_function
+        mode = mode or self.mode
+        options = options or {}
+        timeout = self.timeout if timeout is None else timeout
+        key = (instance['start'].tobytes(),instance['start'].shape,instance['goal'].tobytes(),
+               heuristic_function,mode,json.dumps(options,sort_keys=True))
+        loop = asyncio.get_running_loop()
+        waiting = self.in_flight.get(key)
+        coalesced = waiting is not None
+        if not coalesced:
+            waiting = self.in_flight[key] = [loop.create_future(),0,0.0]
+            waiting[0].add_done_callback(lambda _: self.in_flight.pop(key,None))
+        waiting[1] += 1
+        waiting[2] = max(waiting[2],loop.time()+timeout)
+        
+        async def wait():
+            if not coalesced:
+                await self.queue.put((waiting,instance,heuristic_function,mode,options))
+            if queued is not None:
+                queued.set()
+            return await asyncio.shield(waiting[0])
+        try:
+            result = await asyncio.wait_for(wait(),timeout)
+        except asyncio.TimeoutError:
+            return {'id':instance['id'],'status':'timeout','error':'no result after {}s'.format(timeout)}
+        finally:
+            waiting[1] -= 1
+            if not waiting[1] and not waiting[0].done():
+                waiting[0].cancel() # nobody waits for it any more, it is dropped from the queue
+        return dict(result,id=instance['id'])
+
+    async def handle_request(self,line,writer,queued):
+        request = {}
+        try:
+            request = json.loads(line)
+            instance = parse_instance(request)
+            heuristic_function,mode,options,timeout = parse_settings(request)
+        except Exception as e:
+            queued.set()
+            request_id = request.get('id') if isinstance(request,dict) else None
+            result = {'id':request_id,'status':'error','error':'bad request, {}: {}'.format(type(e).__name__,e)}
+        else:
+            try:
+                result = await self.solve(instance,heuristic_function,mode,options,timeout,queued)
+            finally:
+                queued.set()
+        writer.write((json.dumps(result)+'\n').encode())
+        await writer.drain()
+
+    async def handle_connection(self,reader,writer):
+        """
+        Reads the requests of a connection, each is solved in its own task and answered when done.
+        The next line is only read once the last request is queued: a full queue stops the reading (backpressure).
+        """
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                queued = asyncio.Event()
+                task = asyncio.create_task(self.handle_request(line,writer,queued))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                await queued.wait()
+            await asyncio.gather(*tasks,return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def serve(path=None,host='127.0.0.1',port=0,**settings):
+    """Runs a SolveService until interrupted, settings are passed to SolveService."""
+    async def run():
+        service = SolveService(**settings)
+        server = await service.start(path,host,port)
+        print('serving on',path or '{}:{}'.format(*server.sockets[0].getsockname()[:2]),flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            service.close()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
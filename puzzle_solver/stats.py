@@ -0,0 +1,61 @@
+"""Measures of the searches, returned with the path."""
+
+
+class SearchStats():
+    """
+    Measures of one search.
+    expansions: number of nodes expanded, generations: number of children generated,
+    duplicates: children dropped because their state was already reached as cheaply
+    (in CLOSED or OPEN for A*, in the transposition table for IDA*).
+    peak_open: max number of states in OPEN (both ends for the bidirectional searches), for IDA* the longest path of the depth first search.
+    peak_closed: max number of states in CLOSED, for IDA* in the transposition table,
+    for the bidirectional searches the states reached from both ends.
+    iterations: number of depth first searches of IDA*, of weights of ARA*, 1 for A*.
+    suboptimality: bound on the ratio of the path length to the optimal one, 1 for the optimal searches.
+    exhausted: True when the time or expansion budget ran out and the best path found so far was returned.
+    setup_time (solvability check, heuristic), search_time and path_time (building and printing the path) are in seconds.
+    """
+    FIELDS = ('expansions','generations','duplicates','peak_open','peak_closed','iterations',
+              'suboptimality','exhausted','setup_time','search_time','path_time')
+
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self,field,0)
+        self.suboptimality = 1.0
+        self.exhausted = False
+
+    def __repr__(self):
+        return 'SearchStats({})'.format(', '.join('{}={}'.format(field,getattr(self,field)) for field in self.FIELDS))
+
+    @property
+    def total_time(self) -> float:
+        return self.setup_time+self.search_time+self.path_time
+
+    @property
+    def nodes_per_second(self) -> float:
+        """Expansions per second of search."""
+        return self.expansions/self.search_time if self.search_time else 0.0
+
+    def as_dict(self) -> dict:
+        """Returns the measures as a dict that can be written as JSON."""
+        stats = {field:getattr(self,field) for field in self.FIELDS}
+        stats.update(total_time=self.total_time,nodes_per_second=self.nodes_per_second)
+        return stats
+
+    def report(self) -> str:
+        """Returns the measures as text."""
+        lines = ['Time performance: {} nodes expanded, {} children generated, {} duplicates.'.format(self.expansions,self.generations,self.duplicates),
+                 'Space performance: {} nodes in OPEN and {} in CLOSED at their max.'.format(self.peak_open,self.peak_closed),
+                 'Time spent: %0.2fs (setup %0.2fs, search %0.2fs, path %0.2fs), %d nodes/s' % (
+                     self.total_time,self.setup_time,self.search_time,self.path_time,self.nodes_per_second)]
+        if self.suboptimality != 1 or self.exhausted:
+            lines.append('Suboptimality: at most %0.2f times the optimal length%s.' % (
+                self.suboptimality,', the budget ran out' if self.exhausted else ''))
+        return '\n'.join(lines)
+
+
+class SearchResult(list):
+    """The path found by a search, a list of (tile, action), with the SearchStats of the search in stats."""
+    def __init__(self,path,stats):
+        super().__init__(path)
+        self.stats = stats
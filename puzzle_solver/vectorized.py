@@ -0,0 +1,219 @@
+"""NumPy tables and node arrays of the searches expanding a whole level or block of states at once."""
+import functools
+import heapq
+
+import numpy as np
+
+from .board import UP,DOWN,LEFT,RIGHT
+from .heuristics import HEURISTICS
+
+
+# The vectorized searches hold their states as a 2-D array of tiles, one state per row, and as packed states
+# (see Board) in uint64, so only the boards of 64 bits at most are supported: up to 4x4.
+# A move is a number, the index of its action in VECTOR_ACTIONS.
+VECTOR_ACTIONS = (DOWN,RIGHT,UP,LEFT) # the order of the neighbor table of Board
+NODES_CAPACITY = 1 << 16 # initial number of nodes of a VectorNodes, doubled when full
+H_KEY_BITS = 16 # bits of h in the keys of the buckets of a VectorFrontier, h being an int16
+
+
+class VectorBoard():
+    """
+    NumPy version of the tables of a Board: packing of the states and generation of the children of many states at once.
+    moves[blank, move] is the index of the tile moved by the move when the blank is at blank, -1 when the move is not allowed.
+    """
+    def __init__(self,board):
+        if board.size*board.tile_bits > 64:
+            raise ValueError('the vectorized searches only run on boards of 64 bits at most, not {}'.format(board))
+        self.board = board
+        self.size = board.size
+        self.shifts = np.arange(board.size,dtype=np.uint64)*np.uint64(board.tile_bits)
+        self.tile_mask = np.uint64(board.tile_mask)
+        self.moves = np.full((board.size,len(VECTOR_ACTIONS)),-1,dtype=np.intp)
+        for blank,moves in enumerate(board.neighbors):
+            for index,_,action in moves:
+                self.moves[blank,VECTOR_ACTIONS.index(action)] = index
+
+    def pack(self,tiles) -> np.ndarray:
+        """Packs the rows of tiles into uint64 packed states."""
+        return np.bitwise_or.reduce(tiles.astype(np.uint64) << self.shifts,axis=1)
+
+    def unpack(self,codes) -> np.ndarray:
+        """Unpacks uint64 packed states into rows of tiles."""
+        return ((codes[:,None] >> self.shifts) & self.tile_mask).astype(np.uint8)
+
+    def expand(self,tiles,blanks) -> tuple:
+        """
+        Generates the children of every row of tiles, blanks being the index of their blank.
+        Returns (children, child blanks, parent rows, moved tiles, moves): the tiles of the children,
+        the index of their blank (where the tile was), the row of their parent, the tile moved and the move.
+        """
+        targets = self.moves[blanks]
+        rows,moves = np.nonzero(targets >= 0)
+        child_blanks = targets[rows,moves]
+        children = tiles[rows]
+        order = np.arange(len(rows))
+        moved = children[order,child_blanks]
+        children[order,blanks[rows]] = moved
+        children[order,child_blanks] = 0
+        return children,child_blanks,rows,moved,moves.astype(np.uint8)
+
+
+@functools.lru_cache(maxsize=None)
+def get_vector_board(board) -> VectorBoard:
+    """Returns the vector tables of the board, built once."""
+    return VectorBoard(board)
+
+
+class VectorHeuristic():
+    """
+    Heuristic cost of many states at once, from the cost table of a HeuristicTable:
+    h is the sum of cost[tile, index] over the cells, read by fancy indexing.
+    """
+    def __init__(self,board,goal_code,heuristic_function):
+        if heuristic_function not in HEURISTICS:
+            raise ValueError('the vectorized searches support the heuristics {}, not {}'.format(', '.join(sorted(HEURISTICS)),heuristic_function))
+        self.cost = np.array(HEURISTICS[heuristic_function](board,goal_code),dtype=np.int16)
+        self.cells = np.arange(board.size)
+
+    def __call__(self,tiles) -> np.ndarray:
+        return self.cost[tiles,self.cells].sum(axis=1,dtype=np.int16)
+
+    def child_cost(self,h,moved,from_index,to_index) -> np.ndarray:
+        """Cost of the children, reached by moving the tiles moved from from_index to to_index in states of cost h."""
+        return h+self.cost[moved,to_index]-self.cost[moved,from_index]
+
+@functools.lru_cache(maxsize=64)
+def get_vector_heuristic(board,goal_code,heuristic_function) -> VectorHeuristic:
+    """Returns the vectorized heuristic for the goal state, built once per goal."""
+    return VectorHeuristic(board,goal_code,heuristic_function)
+
+
+class VectorNodes():
+    """
+    The nodes reached by a vectorized search, indexed by node id like a NodeStore, in NumPy arrays:
+    the packed state, the id of the parent (-1 for a root), the depth, the heuristic cost,
+    and the tile moved and the move from the parent. The arrays grow by doubling.
+    The reached states are also kept with their ids in sorted runs, so a whole array of states is looked up at once,
+    by a binary search in every run. Every added array is a new run, merged with the last runs while they are
+    not twice larger: the runs are fewer than log2 of the number of states and a state is merged O(log n) times.
+    """
+    FIELDS = (('codes',np.uint64),('parents',np.int64),('depths',np.int32),('h',np.int16),('tiles',np.uint8),('moves',np.uint8))
+
+    def __init__(self,capacity=NODES_CAPACITY):
+        for field,dtype in self.FIELDS:
+            setattr(self,field,np.empty(capacity,dtype=dtype))
+        self.count = 0
+        self.runs = [] # (sorted codes, their ids), from the largest run to the smallest
+
+    def __len__(self):
+        return self.count
+
+    def add(self,codes,parents,depths,h,tiles,moves) -> np.ndarray:
+        """Adds the nodes of states not reached yet, codes being unique, returns their ids."""
+        start,end = self.count,self.count+len(codes)
+        if end > len(self.codes):
+            capacity = max(end,2*len(self.codes))
+            for field,dtype in self.FIELDS:
+                grown = np.empty(capacity,dtype=dtype)
+                grown[:start] = getattr(self,field)[:start]
+                setattr(self,field,grown)
+        for field,values in zip(('codes','parents','depths','h','tiles','moves'),(codes,parents,depths,h,tiles,moves)):
+            getattr(self,field)[start:end] = values
+        self.count = end
+        ids = np.arange(start,end,dtype=np.int64)
+        if not len(codes):
+            return ids
+        order = np.argsort(codes)
+        run_codes,run_ids = codes[order],ids[order]
+        runs = self.runs
+        while runs and len(runs[-1][0]) <= 2*len(run_codes):
+            last_codes,last_ids = runs.pop()
+            run_codes,run_ids = np.concatenate((last_codes,run_codes)),np.concatenate((last_ids,run_ids))
+            order = np.argsort(run_codes,kind='stable') # a merge of the two sorted halves
+            run_codes,run_ids = run_codes[order],run_ids[order]
+        runs.append((run_codes,run_ids))
+        return ids
+
+    def find(self,codes) -> np.ndarray:
+        """Returns the id of the node of every state, -1 for the states not reached."""
+        found = np.full(len(codes),-1,dtype=np.int64)
+        for run_codes,run_ids in self.runs:
+            positions = np.searchsorted(run_codes,codes)
+            positions[positions == len(run_codes)] = 0
+            hits = run_codes[positions] == codes
+            found[hits] = run_ids[positions[hits]]
+        return found
+
+    def steps(self,node) -> list:
+        """Returns the steps from the root to the node, as (packed state, moved tile, action)."""
+        steps = []
+        while self.parents[node] >= 0:
+            steps.append((int(self.codes[node]),int(self.tiles[node]),VECTOR_ACTIONS[self.moves[node]]))
+            node = self.parents[node]
+        return steps[::-1]
+
+
+class VectorFrontier():
+    """
+    The OPEN list of the batched A*, node ids in buckets of the same f(n) and h(n).
+    A bucket is a list of arrays of node ids, the keys f << H_KEY_BITS | h of the buckets are kept in a heap,
+    so taking a block only touches the buckets of the lowest keys, whatever the size of OPEN.
+    An entry whose f(n) is no longer the one of its node (reached again with a lower g(n), and pushed again)
+    is stale: it is left in its bucket and returned by pop, the caller skips it.
+    """
+    def __init__(self):
+        self.buckets = {}
+        self.keys = []
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self,ids,f_scores,h):
+        """Adds the node ids with their f(n) and h(n)."""
+        if not len(ids):
+            return
+        keys = f_scores.astype(np.int64) << H_KEY_BITS | h.astype(np.int64)
+        order = np.argsort(keys,kind='stable')
+        keys,ids = keys[order],ids[order]
+        bounds = np.flatnonzero(keys[1:] != keys[:-1])+1
+        for key,group in zip(keys[np.concatenate(([0],bounds))].tolist(),np.split(ids,bounds)):
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = []
+                heapq.heappush(self.keys,key)
+            bucket.append(group)
+        self.size += len(ids)
+
+    def pop(self,count,below) -> tuple:
+        """
+        Removes and returns up to count entries of the lowest f(n), ties broken on the lowest h(n),
+        only those of f(n) below below: (node ids, their f(n)), empty when there are none.
+        """
+        groups,f_scores = [],[]
+        buckets,keys = self.buckets,self.keys
+        while keys and count > 0 and keys[0] >> H_KEY_BITS < below:
+            key = keys[0]
+            bucket = buckets[key]
+            group = bucket.pop()
+            if len(group) > count:
+                group,rest = group[:count],group[count:]
+                bucket.append(rest)
+            if not bucket:
+                del buckets[key]
+                heapq.heappop(keys)
+            groups.append(group)
+            f_scores.append(np.full(len(group),key >> H_KEY_BITS,dtype=np.int32))
+            count -= len(group)
+        if not groups:
+            return np.empty(0,dtype=np.int64),np.empty(0,dtype=np.int32)
+        ids = np.concatenate(groups)
+        self.size -= len(ids)
+        return ids,np.concatenate(f_scores)
+
+
+def unique_children(codes,depths) -> np.ndarray:
+    """Returns the index of one child of every state of codes, the one with the lowest depth (the first one on a tie)."""
+    order = np.lexsort((depths,codes))
+    _,first = np.unique(codes[order],return_index=True)
+    return order[first]
@@ -0,0 +1,322 @@
+"""
+Pygame front end of the solver, an optional extra: pygame is only imported with this module.
+"""
+import os
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT','1')
+import threading
+
+import numpy as np
+import pygame
+
+from .board import UP,DOWN,LEFT,RIGHT,BOARDHEIGHT,BOARDWIDTH
+from .search import Node,solve
+
+
+#Constants
+TILESIZE = 150
+WINDOWWIDTH = 800
+WINDOWHEIGHT = 600
+FPS = 30
+BLANK = None
+SLIDE_TIME = 0.15 # seconds of the slide of a tile
+REPLAY_DELAY = 0.35 # seconds between two moves of the replay
+STATUS_HEIGHT = 30 # height of the status line at the bottom of the window
+
+
+#                  R    G    B
+BLACK =          (  0,   0,   0)
+WHITE =          (255, 255, 255)
+BRIGHTBLUE =     (  0,  50, 255)
+DARKTURQUOISE =  (  3,  54,  73)
+GREEN =          (  0, 204,   0)
+BEAUTIFUL_BLUE = (187, 212, 252)
+TILE_COLOR =     (   8, 91, 110)
+TILE_FACE =      (196, 178, 128)
+
+# This sets the margin between each cell
+
+XMARGIN = YMARGIN = 10
+
+OPPOSITE_ACTIONS = {UP:DOWN,DOWN:UP,LEFT:RIGHT,RIGHT:LEFT} # the move undoing every move
+
+class SlidePuzzle:
+    """
+    The board in the window. The tile surfaces are rendered once, then a move only redraws the cells
+    of the moved tile and of the blank: update returns the rectangles of the window to refresh (dirty rects).
+    A move slides the tile to the blank over SLIDE_TIME seconds, the grid holds the new state as soon as it starts.
+    """
+    def __init__(self,initial_state:Node) -> None:
+        self.grid = initial_state.state
+        self.node = initial_state
+        rows,cols = self.grid.shape
+        # the tiles shrink to fit the window on large boards
+        self.tile_size = min(TILESIZE,(WINDOWWIDTH-XMARGIN)//cols-XMARGIN,(WINDOWHEIGHT-STATUS_HEIGHT-YMARGIN)//rows-YMARGIN)
+        self.tiles = [(x,y)  for y in range(rows) for x in range(cols)] # (column, row)
+        self.tile_positions = {(x,y):(x*(self.tile_size+XMARGIN)+XMARGIN,y*(self.tile_size+YMARGIN)+YMARGIN) for y in range(rows) for x in range(cols)}
+        self.font = pygame.font.Font('freesansbold.ttf', 100*self.tile_size//TILESIZE)
+        self.tile_surfaces = [None]+[self.render_tile(value) for value in range(1,self.grid.size)]
+        self.blank_position = self.node.get_blank_position() # kept up to date by switch
+        self.slide = None # [cell the tile comes from, cell it goes to, seconds elapsed] of the sliding tile
+        self.dirty = set() # cells to redraw
+
+    def render_tile(self,value):
+        surface = pygame.Surface((self.tile_size,self.tile_size))
+        surface.fill(TILE_COLOR)
+        pygame.draw.rect(surface, TILE_FACE, (0, 0, self.tile_size-10, self.tile_size-10))
+        text = self.font.render(str(value),True,WHITE)
+        surface.blit(text,text.get_rect(center=(self.tile_size//2,self.tile_size//2)))
+        return surface
+
+    def cell_rect(self,cell) -> pygame.Rect:
+        """Rectangle of the cell (row, column) in the window."""
+        left, top = self.tile_positions[cell[1],cell[0]]
+        return pygame.Rect(left, top, self.tile_size, self.tile_size)
+
+    def switch(self,tile):
+        self.grid[self.blank_position],self.grid[tile] = self.grid[tile],self.grid[self.blank_position]
+        self.dirty.update((tile,self.blank_position))
+        self.blank_position = tile
+
+    def reset(self,state):
+        """Puts the tiles of state on the board, the whole board is redrawn."""
+        self.grid[...] = state
+        self.blank_position = self.node.get_blank_position()
+        self.slide = None
+        self.dirty.update((x,y) for y,x in self.tiles)
+
+    def click(self,mouse_pos):
+        """Moves the tile clicked if it is next to the blank, returns the action or None."""
+        blankx,blanky = self.blank_position
+        slideTo = None
+        x,y = mouse_pos[1]%(self.tile_size+YMARGIN),mouse_pos[0]%(self.tile_size+XMARGIN)
+        if x > YMARGIN and y > XMARGIN:
+            tile = mouse_pos[1]//(self.tile_size+YMARGIN),mouse_pos[0]//(self.tile_size+XMARGIN)
+            if tile[0] == blankx + 1 and tile[1] == blanky:
+                slideTo = UP
+            elif tile[0] == blankx - 1 and tile[1] == blanky:
+                slideTo = DOWN
+            elif tile[0] == blankx and tile[1] == blanky + 1:
+                slideTo = LEFT
+            elif tile[0] == blankx and tile[1] == blanky - 1:
+                slideTo = RIGHT
+        if slideTo and self.move_tile(slideTo):
+            return slideTo
+        return None
+
+    def is_valid(self,x,y):
+        """
+        Checks if the move is valid and the moved tile is in the grid.
+        """
+        if x < 0 or y < 0 or x >= self.grid.shape[0] or y >= self.grid.shape[1]:
+            return False
+        return True
+
+    def move_tile(self,direction):
+        """
+        Switchs the blank tile with the given direction, and starts the slide of the tile.
+        A slide still running is finished at once.
+        """
+        blankx, blanky = self.blank_position
+        tile = {UP:(blankx+1,blanky),DOWN:(blankx-1,blanky),LEFT:(blankx,blanky+1),RIGHT:(blankx,blanky-1)}[direction]
+        if not self.is_valid(*tile):
+            return False
+        if self.slide is not None:
+            self.dirty.update(self.slide[:2])
+        self.slide = [tile,self.blank_position,0.0]
+        self.switch(tile)
+        return True
+
+    def draw_cell(self,screen,cell):
+        rect = self.cell_rect(cell)
+        screen.fill(BEAUTIFUL_BLUE,rect)
+        if self.grid[cell]:
+            screen.blit(self.tile_surfaces[self.grid[cell]],rect)
+        return rect
+
+    def draw_board(self,screen, adjx=0, adjy=0):
+        # draw every tile at its board coordinates, optionally a few
+        # pixels over (determined by adjx and adjy), returns the rectangle of the board
+        for x,y in self.tiles:
+            if self.grid[y,x]:
+                left, top = self.tile_positions[x,y]
+                screen.blit(self.tile_surfaces[self.grid[y,x]],(left + adjx, top + adjy))
+        self.dirty.clear()
+        rows,cols = self.grid.shape
+        return self.cell_rect((0,0)).union(self.cell_rect((rows-1,cols-1))).move(adjx,adjy)
+
+    def update(self,screen,dt) -> list:
+        """Advances the slide by dt seconds and draws what changed, returns the dirty rects."""
+        rects = [self.draw_cell(screen,cell) for cell in self.dirty]
+        self.dirty.clear()
+        if self.slide is not None:
+            start,end,elapsed = self.slide
+            elapsed = self.slide[2] = elapsed+dt
+            start_rect,end_rect = self.cell_rect(start),self.cell_rect(end)
+            screen.fill(BEAUTIFUL_BLUE,start_rect)
+            screen.fill(BEAUTIFUL_BLUE,end_rect)
+            if elapsed >= SLIDE_TIME:
+                self.slide = None
+                screen.blit(self.tile_surfaces[self.grid[end]],end_rect)
+            else:
+                t = elapsed/SLIDE_TIME
+                screen.blit(self.tile_surfaces[self.grid[end]],(start_rect.left+(end_rect.left-start_rect.left)*t,
+                                                                start_rect.top+(end_rect.top-start_rect.top)*t))
+            rects.append(start_rect.union(end_rect))
+        return rects
+
+
+class Replay:
+    """
+    Steps through a path of (tile, action) on a SlidePuzzle, forward with the moves of the path
+    and backward with the opposite moves. While playing, one move is made every REPLAY_DELAY seconds.
+    """
+    def __init__(self,puzzle,initial_state,path):
+        self.puzzle = puzzle
+        self.initial_state = np.array(initial_state)
+        self.path = [action for _,action in path]
+        self.step = 0 # number of moves of the path made
+        self.playing = False
+        self.wait = 0.0
+        puzzle.reset(self.initial_state)
+
+    def forward(self) -> bool:
+        if self.step == len(self.path):
+            return False
+        self.puzzle.move_tile(self.path[self.step])
+        self.step += 1
+        return True
+
+    def backward(self) -> bool:
+        if self.step == 0:
+            return False
+        self.step -= 1
+        self.puzzle.move_tile(OPPOSITE_ACTIONS[self.path[self.step]])
+        return True
+
+    def restart(self):
+        self.puzzle.reset(self.initial_state)
+        self.step = 0
+
+    def update(self,dt):
+        if not self.playing or self.puzzle.slide is not None:
+            return
+        self.wait += dt
+        if self.wait >= REPLAY_DELAY:
+            self.wait = 0.0
+            self.playing = self.forward()
+
+
+class SearchProgress:
+    """
+    A search running in a background thread, so the event loop keeps running.
+    It is the on_expand callback of the search: it counts the expanded nodes and keeps the depth and h(n)
+    of the last one, which the event loop reads to show the progress. path or error is set when the search ends.
+    """
+    def __init__(self):
+        self.expansions = 0
+        self.depth = 0
+        self.h = 0
+        self.path = None
+        self.error = None
+        self.done = threading.Event()
+
+    def __call__(self,state,depth,h):
+        self.expansions += 1
+        self.depth = depth
+        self.h = h
+
+    def run(self,initial_state,goal_state,heuristic_function,mode):
+        try:
+            self.path = solve(initial_state,goal_state,heuristic_function,mode,quiet=True,on_expand=self)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+    def start(self,initial_state,goal_state,heuristic_function,mode=None):
+        thread = threading.Thread(target=self.run,args=(initial_state,goal_state,heuristic_function,mode),daemon=True)
+        thread.start()
+        return thread
+
+
+def status_text(progress,replay) -> str:
+    if not progress.done.is_set():
+        return 'searching: {} nodes expanded, depth {}, h {}'.format(progress.expansions,progress.depth,progress.h)
+    if replay is None:
+        return 'no path: {}'.format(progress.error or 'the goal state cannot be reached')
+    return 'move {}/{}   space: play/pause   left/right: step   r: restart'.format(replay.step,len(replay.path))
+
+def main(initial_state=None,goal_state=None,heuristic_function='num_misplaced',mode=None):
+    global FPSCLOCK
+    pygame.init()
+
+    # initial_state_tp = np.array([1,2,3,8,0,4,7,6,5]).reshape(3,3)
+    # goal_state_tp = np.array([3,4,7,5,0,8,1,2,6]).reshape(3,3)
+
+    if initial_state is None:
+        initial_state = np.array([2,8,3,1,6,4,7,0,5]).reshape(BOARDHEIGHT,BOARDWIDTH)
+    if goal_state is None:
+        goal_state = np.array([1,2,3,8,0,4,7,6,5]).reshape(BOARDHEIGHT,BOARDWIDTH)
+
+    # the search runs in the background while the board can already be played with the mouse
+    progress = SearchProgress()
+    progress.start(np.array(initial_state),goal_state,heuristic_function,mode)
+
+    pygame.display.set_caption('A* slide solver')
+    screen = pygame.display.set_mode((WINDOWWIDTH,WINDOWHEIGHT))
+    FPSCLOCK = pygame.time.Clock()
+    status_font = pygame.font.Font('freesansbold.ttf', 16)
+    status_rect = pygame.Rect(0,WINDOWHEIGHT-STATUS_HEIGHT,WINDOWWIDTH,STATUS_HEIGHT)
+
+    root_node = Node(state=np.array(initial_state),parent=None,action=None,depth=0,step_cost=0,path_cost=0,heuristic_cost=0)
+    slide_puzzle = SlidePuzzle(initial_state=root_node)
+    replay = None
+    status = None
+    solved = False
+
+    screen.fill(BEAUTIFUL_BLUE)
+    slide_puzzle.draw_board(screen)
+    pygame.display.flip()
+
+    while True:
+        dt = FPSCLOCK.tick(FPS)/1000
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and replay is None:
+                slide_puzzle.click(event.pos)
+            elif event.type == pygame.KEYDOWN and replay is not None:
+                if event.key == pygame.K_SPACE:
+                    replay.playing = not replay.playing
+                elif event.key == pygame.K_RIGHT:
+                    replay.playing = False
+                    replay.forward()
+                elif event.key == pygame.K_LEFT:
+                    replay.playing = False
+                    replay.backward()
+                elif event.key == pygame.K_r:
+                    replay.playing = False
+                    replay.restart()
+
+        if replay is None and progress.path is not None:
+            for value,direction in progress.path:
+                print(str(value)+ '->' + direction)
+            replay = Replay(slide_puzzle,initial_state,progress.path)
+            replay.playing = True
+        if replay is not None:
+            replay.update(dt)
+
+        rects = slide_puzzle.update(screen,dt)
+        if rects and slide_puzzle.slide is None and not solved and np.array_equal(slide_puzzle.grid,goal_state):
+            print('YEEY')
+            solved = True
+        text = status_text(progress,replay)
+        if text != status:
+            status = text
+            screen.fill(BEAUTIFUL_BLUE,status_rect)
+            screen.blit(status_font.render(text,True,DARKTURQUOISE),(XMARGIN,status_rect.top+(STATUS_HEIGHT-16)//2))
+            rects.append(status_rect)
+        if rects:
+            pygame.display.update(rects)
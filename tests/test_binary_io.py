@@ -0,0 +1,89 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from puzzle_solver.binary_io import ACTION_CODES,BinaryReader,BinaryWriter,binary_to_jsonl,jsonl_to_binary
+from puzzle_solver.board import UP,DOWN,LEFT,RIGHT,goal_state
+from puzzle_solver.search import solve
+
+
+START = np.array([[2,8,3],[1,6,4],[7,0,5]])
+GOAL = np.array([[1,2,3],[8,0,4],[7,6,5]])
+FIRST_MOVE = 16+3+2 # byte of the first move of the first record: header, goal, rank, length
+
+
+def write_file(tmp_path,records,goal=None) -> str:
+    path = str(tmp_path/'paths.bin')
+    with open(path,'wb') as f,BinaryWriter(f,goal) as writer:
+        for start,goal_tiles,path_moves in records:
+            writer.write(start,goal_tiles,path_moves)
+    return path
+
+def test_round_trip(tmp_path):
+    path = solve(START,GOAL,quiet=True)
+    unsolved = np.array([[1,2,3],[4,5,6],[0,7,8]])
+    with BinaryReader(write_file(tmp_path,[(START,GOAL,path),(unsolved,GOAL,None),(GOAL,GOAL,[])])) as reader:
+        records = list(reader)
+        assert np.array_equal(reader.goal,GOAL)
+    assert [np.array_equal(record['start'],start) for record,start in zip(records,(START,unsolved,GOAL))] == [True]*3
+    assert records[0]['path'] == [(int(tile),action) for tile,action in path]
+    assert records[1]['path'] is None
+    assert records[2]['path'] == []
+
+def test_jsonl_round_trip(tmp_path):
+    path = solve(START,GOAL,quiet=True)
+    line = {'id':0,'start':START.tolist(),'goal':GOAL.tolist(),'path':[[int(tile),action] for tile,action in path]}
+    binary_path = str(tmp_path/'paths.bin')
+    with open(binary_path,'wb') as out:
+        assert jsonl_to_binary(io.StringIO(json.dumps(line)+'\n'),out) == 1
+    out = io.StringIO()
+    assert binary_to_jsonl(binary_path,out) == 1
+    record = json.loads(out.getvalue())
+    assert record['start'] == line['start'] and record['path'] == line['path'] and record['status'] == 'solved'
+
+@pytest.mark.parametrize('path_moves',[
+    [(7,RIGHT),(6,RIGHT)], # no tile on the left of the blank to move right
+    [(6,LEFT)], # moves tile 5
+    [(6,DOWN)], # a legal move to another state than the goal
+])
+def test_writer_rejects_wrong_paths(path_moves):
+    out = io.BytesIO()
+    writer = BinaryWriter(out,GOAL)
+    header = out.getvalue()
+    with pytest.raises(ValueError):
+        writer.write(START,GOAL,path_moves)
+    assert out.getvalue() == header # nothing written
+
+def test_writer_rejects_another_goal():
+    writer = BinaryWriter(io.BytesIO(),GOAL)
+    with pytest.raises(ValueError):
+        writer.write(START,goal_state(3,3),None)
+
+def test_file_without_records(tmp_path):
+    with BinaryReader(write_file(tmp_path,[])) as reader:
+        assert list(reader) == []
+    with BinaryReader(write_file(tmp_path,[],GOAL)) as reader:
+        assert list(reader) == [] and np.array_equal(reader.goal,GOAL)
+
+def test_reader_rejects_empty_and_truncated_files(tmp_path):
+    empty = tmp_path/'empty.bin'
+    empty.write_bytes(b'')
+    with pytest.raises(ValueError,match='empty'):
+        BinaryReader(str(empty))
+    data = open(write_file(tmp_path,[(START,GOAL,solve(START,GOAL,quiet=True))]),'rb').read()
+    truncated = tmp_path/'truncated.bin'
+    for end in (3,10,len(data)-1):
+        truncated.write_bytes(data[:end])
+        with pytest.raises(ValueError):
+            with BinaryReader(str(truncated)) as reader:
+                list(reader)
+
+def test_reader_rejects_illegal_moves(tmp_path):
+    data = bytearray(open(write_file(tmp_path,[(START,GOAL,solve(START,GOAL,quiet=True))]),'rb').read())
+    data[FIRST_MOVE] = data[FIRST_MOVE] & ~3 | ACTION_CODES[UP] # no tile below the blank of the bottom row to move up
+    corrupted = tmp_path/'corrupted.bin'
+    corrupted.write_bytes(bytes(data))
+    with BinaryReader(str(corrupted)) as reader,pytest.raises(ValueError,match='not allowed'):
+        list(reader)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from puzzle_solver.binary_io import move_table,play_moves
+from puzzle_solver.cache import SolutionCache
+from puzzle_solver.search import solve
+
+
+START = np.array([[8,6,7],[2,5,4],[3,0,1]])
+GOAL = np.array([[1,2,3],[4,5,6],[7,8,0]])
+
+
+def leads_to_goal(start,goal,path) -> bool:
+    """Tells if the path, a list of (tile, action), is played from start to goal."""
+    tiles = np.ravel(start).tolist()
+    played = play_moves(tiles,[action for _,action in path],move_table(*np.shape(start)))
+    return played == [(int(tile),action) for tile,action in path] and tiles == np.ravel(goal).tolist()
+
+def relabel(state,names):
+    """Renames the tiles of the state, names[tile] being the new name of tile."""
+    return np.asarray(names)[state]
+
+SYMMETRIES = {
+    'same':lambda state: state,
+    'flip_rows':np.flipud,
+    'flip_cols':np.fliplr,
+    'transpose':np.transpose,
+    'rotate':np.rot90,
+    'relabel':lambda state: relabel(state,[0,5,3,8,1,7,2,4,6]),
+    'transpose_relabel':lambda state: relabel(state.T,[0,8,7,6,5,4,3,2,1]),
+}
+
+@pytest.fixture(scope='module')
+def cache():
+    cache = SolutionCache()
+    cache.put(START,GOAL,solve(START,GOAL,quiet=True))
+    return cache
+
+@pytest.mark.parametrize('symmetry',sorted(SYMMETRIES))
+def test_symmetric_instances_hit(cache,symmetry):
+    move = SYMMETRIES[symmetry]
+    start,goal = move(START),move(GOAL)
+    path = cache.get(start,goal)
+    assert path is not None and len(path) == 31 and leads_to_goal(start,goal,path)
+
+def test_states_on_the_path_hit(cache):
+    tiles = START.ravel().tolist()
+    path = solve(START,GOAL,quiet=True)
+    play_moves(tiles,[action for _,action in path[:10]],move_table(3,3))
+    middle = np.array(tiles).reshape(3,3)
+    path = cache.get(middle,GOAL)
+    assert path is not None and len(path) == 21 and leads_to_goal(middle,GOAL,path)
+
+def test_other_instances_miss(cache):
+    misses = cache.misses
+    assert cache.get(START,np.array([[1,2,3],[8,0,4],[7,6,5]])) is None
+    assert cache.misses == misses+1
+
+def test_solve_searches_once():
+    cache = SolutionCache()
+    first = cache.solve(START,GOAL)
+    second = cache.solve(np.fliplr(START),np.fliplr(GOAL))
+    assert first.stats.expansions > 0 and second.stats.expansions == 0
+    assert cache.hits == 1 and len(second) == len(first)
+
+def test_rectangular_board_transposed():
+    start,goal = np.array([[4,1,2],[5,0,3]]),np.array([[1,2,3],[4,5,0]])
+    cache = SolutionCache()
+    cache.put(start,goal,solve(start,goal,quiet=True))
+    path = cache.get(start.T,goal.T)
+    assert path is not None and leads_to_goal(start.T,goal.T,path)
+
+def test_saved_in_sqlite(tmp_path):
+    path = str(tmp_path/'paths.db')
+    cache = SolutionCache(path=path)
+    cache.put(START,GOAL,solve(START,GOAL,quiet=True))
+    cache.close()
+    cache = SolutionCache(path=path)
+    assert len(cache) == 0 and cache.get(np.flipud(START),np.flipud(GOAL)) is not None
+    cache.close()
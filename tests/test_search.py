@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from puzzle_solver import lookup_table,pattern_database
+from puzzle_solver.benchmark import goal_depths,hardest_instances,random_instances
+from puzzle_solver.binary_io import move_table,play_moves
+from puzzle_solver.heuristics import HEURISTIC_FUNCTIONS
+from puzzle_solver.search import OPTIMAL_MODES,WEIGHT,BudgetExceededError,solve
+
+
+INSTANCES = random_instances(depths=(1,8,16,24),per_depth=2,depth_table=goal_depths(3,3))+hardest_instances()
+INSTANCE_IDS = [instance['id'] for instance in INSTANCES]
+
+
+@pytest.fixture(scope='module',autouse=True)
+def table_dir(tmp_path_factory):
+    """The pattern databases and the lookup table are built in a temporary directory, not in the package."""
+    with pytest.MonkeyPatch.context() as patch:
+        path = str(tmp_path_factory.mktemp('tables'))
+        patch.setattr(pattern_database,'PDB_DIR',path)
+        patch.setattr(lookup_table,'PDB_DIR',path)
+        pattern_database.load_pattern_database.cache_clear()
+        lookup_table.load_lookup_table.cache_clear()
+        yield path
+    pattern_database.load_pattern_database.cache_clear()
+    lookup_table.load_lookup_table.cache_clear()
+
+def check_path(instance,path):
+    """Asserts that the path, a list of (tile, action), is played from the start to the goal of the instance."""
+    tiles = instance['start'].ravel().tolist()
+    played = play_moves(tiles,[action for _,action in path],move_table(*instance['start'].shape))
+    assert played == [(int(tile),action) for tile,action in path]
+    assert tiles == instance['goal'].ravel().tolist()
+
+@pytest.mark.parametrize('mode',OPTIMAL_MODES+('vector_bfs',))
+@pytest.mark.parametrize('instance',INSTANCES,ids=INSTANCE_IDS)
+def test_optimal_modes(instance,mode):
+    path = solve(instance['start'],instance['goal'],'manhattan',mode,quiet=True)
+    check_path(instance,path)
+    assert len(path) == instance['depth']
+
+@pytest.mark.parametrize('heuristic_function',HEURISTIC_FUNCTIONS)
+@pytest.mark.parametrize('mode',('a_star','ida_star','mm'))
+def test_admissible_heuristics(heuristic_function,mode):
+    for instance in (instance for instance in INSTANCES if instance['depth'] == 24):
+        path = solve(instance['start'],instance['goal'],heuristic_function,mode,quiet=True)
+        assert len(path) == instance['depth']
+
+@pytest.mark.parametrize('mode,options',[
+    ('weighted_a_star',{}),
+    ('weighted_a_star',{'weight':1.5}),
+    ('weighted_a_star',{'weight':5.0}),
+    ('ara_star',{}),
+    ('ara_star',{'max_expansions':50}),
+    ('greedy',{}),
+    ('vector_bfs',{'beam_width':64}),
+])
+@pytest.mark.parametrize('instance',INSTANCES,ids=INSTANCE_IDS)
+def test_bounded_modes(instance,mode,options):
+    try:
+        path = solve(instance['start'],instance['goal'],'manhattan',mode,quiet=True,**options)
+    except BudgetExceededError:
+        assert 'max_expansions' in options # no path within the budget
+        return
+    if path is None:
+        assert mode == 'vector_bfs' # the beam lost every path
+        return
+    check_path(instance,path)
+    bound = path.stats.suboptimality
+    assert instance['depth'] <= len(path) <= bound*instance['depth']+1e-9
+    if mode == 'weighted_a_star':
+        assert bound <= options.get('weight',WEIGHT)
+    if mode == 'ara_star' and not path.stats.exhausted:
+        assert bound == 1 and len(path) == instance['depth']
+
+def test_solved_instance():
+    goal = np.array([[1,2,3],[4,5,6],[7,8,0]])
+    for mode in OPTIMAL_MODES:
+        assert len(solve(goal,goal,mode=mode,quiet=True)) == 0
@@ -0,0 +1,36 @@
+import numpy as np
+
+from puzzle_solver.vectorized import VectorFrontier,VectorNodes
+
+
+def test_nodes_find_the_added_states():
+    rng = np.random.default_rng(0)
+    nodes = VectorNodes(capacity=16)
+    ids = {}
+    for size in rng.integers(0,300,size=200):
+        codes = np.unique(rng.integers(0,1 << 40,size=size,dtype=np.uint64))
+        codes = codes[nodes.find(codes) < 0]
+        zeros = np.zeros(len(codes),dtype=np.int64)
+        for code,node in zip(codes.tolist(),nodes.add(codes,zeros-1,zeros,zeros,zeros,zeros).tolist()):
+            ids[code] = node
+    assert len(nodes) == len(ids) and len(nodes.runs) <= np.log2(len(ids))+1
+    codes = np.array(list(ids),dtype=np.uint64)
+    assert nodes.find(codes).tolist() == list(ids.values())
+    assert (nodes.find(rng.integers(1 << 41,1 << 42,size=100,dtype=np.uint64)) == -1).all()
+
+def test_frontier_pops_the_lowest_f_then_h():
+    rng = np.random.default_rng(1)
+    frontier = VectorFrontier()
+    f_scores,h = rng.integers(10,20,size=1000),rng.integers(0,10,size=1000)
+    frontier.push(np.arange(1000),f_scores,h)
+    popped = []
+    while len(frontier):
+        ids,f_block = frontier.pop(64,below=18)
+        if not len(ids):
+            break
+        assert (f_scores[ids] == f_block).all() and (f_block < 18).all()
+        popped.extend(ids.tolist())
+    expected = sorted(np.flatnonzero(f_scores < 18).tolist(),key=lambda node: (f_scores[node],h[node]))
+    assert sorted(popped) == sorted(expected)
+    assert [(f_scores[node],h[node]) for node in popped] == [(f_scores[node],h[node]) for node in expected]
+    assert len(frontier) == np.count_nonzero(f_scores >= 18)